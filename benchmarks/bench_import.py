@@ -0,0 +1,95 @@
+"""
+Startup cost of the package and the command line tool, every scenario runs in a fresh
+interpreter. Run from the repository root with
+
+    python -m benchmarks.bench_import --repeat 20 --output startup.json
+    python -m benchmarks.bench_import --compare startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from . import synthetic
+
+# modules whose import is slow enough to be worth watching
+HEAVY_MODULES = ("numpy", "PIL", "tkinter", "decimal", "multiprocessing", "sqlite3")
+REPORT_MODULES = (
+    "import sys, json; "
+    f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+)
+
+
+def scenarios(folder:str):
+    """
+    (name, python code) of every scenario, the conversions use a file generated into folder
+    """
+    bin_file = os.path.join(folder, "face.bin")
+    with open(bin_file, "wb") as file:
+        file.write(synthetic.bin_file("pc", 2000, 64))
+    return [
+        ("interpreter", "pass"),
+        ("package", "import file_structure"),
+        ("peek", f"from file_structure.detection import is_model_bin; is_model_bin({bin_file!r})"),
+        ("model_tool", "import model_tool"),
+        ("convert_obj", f"import model_tool; model_tool.main([{bin_file!r}, '-p', 'pc'])"),
+        ("convert_glb", f"import model_tool; model_tool.main([{bin_file!r}, '-p', 'pc', '-f', 'glb'])"),
+    ]
+
+def run_scenario(code:str, repeat:int):
+    """
+    Wall times of repeat fresh interpreters running code, and the heavy modules it left loaded
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    loaded = subprocess.run(
+        [sys.executable, "-c", f"{code}\n{REPORT_MODULES}"], check=True, capture_output=True, text=True
+    )
+    return timings, json.loads(loaded.stdout.splitlines()[-1])
+
+def run(repeat:int):
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for name, code in scenarios(folder):
+            timings, modules = run_scenario(code, repeat)
+            results.append({
+                "scenario": name,
+                "seconds_median": statistics.median(timings),
+                "seconds_min": min(timings),
+                "modules": modules,
+            })
+            print(f"{name:12} {results[-1]['seconds_median'] * 1000:9.1f} ms  {', '.join(modules) or '-'}")
+    return results
+
+def compare(results:list, baseline_file:str):
+    with open(baseline_file, "r", encoding="utf-8") as json_file:
+        baseline = {result["scenario"]: result for result in json.load(json_file)["results"]}
+    print(f"compared with {baseline_file}")
+    for result in results:
+        old = baseline.get(result["scenario"])
+        if old is None or not result["seconds_median"]:
+            continue
+        print(f"{result['scenario']:12} {old['seconds_median'] / result['seconds_median']:6.2f}x")
+
+def main(argv:list=None):
+    parser = argparse.ArgumentParser(description="Startup time of the package and the command line tool")
+    parser.add_argument("--repeat", type=int, default=10, help="fresh interpreters started for each scenario")
+    parser.add_argument("-o", "--output", help="save the results into this json file")
+    parser.add_argument("--compare", metavar="JSON", help="compare against the results of a previous run")
+    args = parser.parse_args(argv)
+    results = run(args.repeat)
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as json_file:
+            json.dump({"python": sys.version.split()[0], "results": results}, json_file, indent=2)
+
+if __name__ == "__main__":
+    main()
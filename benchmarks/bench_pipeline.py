@@ -0,0 +1,157 @@
+"""
+Benchmark of the conversion stages over generated inputs, run from the repository root with
+
+    python -m benchmarks.bench_pipeline --vertices 20000 --texture 256 --output results.json
+    python -m benchmarks.bench_pipeline --compare results.json
+"""
+import argparse
+import json
+import os
+import platform as python_platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+from file_structure import Container, FacePCModel, FacePS2Model, PESImage, PNGImage, unzlib_it
+from file_structure.models import FacePSPModel
+from model_tool import create_glb, create_obj
+from . import synthetic
+
+MODEL_CLASSES = {"pc": FacePCModel, "ps2": FacePS2Model, "psp": FacePSPModel}
+
+
+def measure(stage, repeat:int):
+    """
+    Time repeat calls of stage and run it once more under tracemalloc,
+    returns the timings, the peak of traced memory and the blocks allocated by the call
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = stage()
+    after = tracemalloc.take_snapshot()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # blocks still alive after the call, the result included
+    blocks = sum(max(stat.count_diff, 0) for stat in after.compare_to(before, "filename"))
+    del result
+    return timings, peak_bytes, blocks
+
+def png_stage(texture:bytearray, compression:int=-1):
+    pes_image = PESImage()
+    pes_image.from_bytes(bytearray(texture))
+    pes_image.bgr_to_bgri()
+    png_image = PNGImage()
+    png_image.png_from_pes_img(pes_image, compression)
+    return png_image.png
+
+def rgba_stage(texture:bytearray):
+    pes_image = PESImage()
+    pes_image.from_bytes(bytearray(texture))
+    pes_image.bgr_to_bgri()
+    return pes_image.to_rgba()
+
+def platform_stages(platform:str, vertices:int, texture_size:int, folder:str):
+    """
+    (stage name, callable, bytes processed, items processed) of every stage for one platform
+    """
+    bin_bytes = synthetic.bin_file(platform, vertices, texture_size)
+    container_bytes = unzlib_it(bin_bytes[32:])
+    container = Container(container_bytes)
+    model_bytes = container.get_file(0)
+    texture = container.get_file(1)
+    model = MODEL_CLASSES[platform](model_bytes)
+    mesh = model.mesh
+    png = png_stage(texture)
+    obj_name = f"bench_{platform}"
+    stages = [
+        ("inflate", lambda: unzlib_it(bin_bytes[32:]), len(bin_bytes) - 32, 1),
+        ("container", lambda: Container(container_bytes), len(container_bytes), container.total_files),
+        # the geometry is decoded on the first use of the mesh
+        ("decode", lambda: MODEL_CLASSES[platform](model_bytes).mesh, len(model_bytes), mesh.vertex_count),
+        ("png", lambda: png_stage(texture), len(texture), texture_size * texture_size),
+        ("png_store", lambda: png_stage(texture, 0), len(texture), texture_size * texture_size),
+        ("rgba", lambda: rgba_stage(texture), len(texture), texture_size * texture_size),
+        ("obj", lambda: create_obj(model, folder, obj_name, True), None, mesh.face_count),
+        ("glb", lambda: create_glb(model, png, folder, obj_name), None, mesh.face_count),
+    ]
+    return stages, mesh
+
+def run(platforms:list, vertices:int, texture_size:int, repeat:int):
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for platform in platforms:
+            stages, mesh = platform_stages(platform, vertices, texture_size, folder)
+            for name, stage, stage_bytes, items in stages:
+                timings, peak_bytes, blocks = measure(stage, repeat)
+                if stage_bytes is None:
+                    # the writers are measured by the size of what they produced
+                    extension = "glb" if name == "glb" else "obj"
+                    stage_bytes = os.path.getsize(os.path.join(folder, f"bench_{platform}.{extension}"))
+                median = statistics.median(timings)
+                results.append({
+                    "platform": platform,
+                    "stage": name,
+                    "seconds_min": min(timings),
+                    "seconds_median": median,
+                    "bytes": stage_bytes,
+                    "mb_per_s": stage_bytes / 1048576 / median if median else 0,
+                    "items": items,
+                    "items_per_s": items / median if median else 0,
+                    "peak_bytes": peak_bytes,
+                    "blocks": blocks,
+                })
+                print(
+                    f"{platform:4} {name:10} {median * 1000:9.3f} ms {results[-1]['mb_per_s']:9.2f} MB/s "
+                    f"{results[-1]['items_per_s']:12.0f} items/s {peak_bytes / 1024:9.1f} KiB peak {blocks:7} blocks"
+                )
+    return results
+
+def compare(results:list, baseline_file:str):
+    """
+    Print the median time of every stage against the one of a previous run
+    """
+    with open(baseline_file, "r", encoding="utf-8") as json_file:
+        baseline = {(result["platform"], result["stage"]): result for result in json.load(json_file)["results"]}
+    print(f"compared with {baseline_file}")
+    for result in results:
+        old = baseline.get((result["platform"], result["stage"]))
+        if old is None or not result["seconds_median"]:
+            continue
+        print(f"{result['platform']:4} {result['stage']:10} {old['seconds_median'] / result['seconds_median']:6.2f}x")
+
+def main(argv:list=None):
+    parser = argparse.ArgumentParser(description="Benchmark of the conversion stages over generated models")
+    parser.add_argument("-p", "--platform", choices=synthetic.PLATFORMS, action="append", help="platforms to run, all by default")
+    parser.add_argument("--vertices", type=int, default=20000, help="vertices of each generated model")
+    parser.add_argument("--texture", type=int, default=256, help="width and height of each generated texture")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs of each stage")
+    parser.add_argument("-o", "--output", help="save the results into this json file")
+    parser.add_argument("--compare", metavar="JSON", help="compare against the results of a previous run")
+    args = parser.parse_args(argv)
+    results = run(args.platform or synthetic.PLATFORMS, args.vertices, args.texture, args.repeat)
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        report = {
+            "meta": {
+                "python": python_platform.python_version(),
+                "numpy": np.__version__,
+                "machine": python_platform.machine(),
+                "vertices": args.vertices,
+                "texture": args.texture,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as json_file:
+            json.dump(report, json_file, indent=2)
+
+if __name__ == "__main__":
+    main()
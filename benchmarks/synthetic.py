@@ -0,0 +1,189 @@
+"""
+Generated face/hair .bin files with the layouts the parsers expect, no game asset is needed
+"""
+import struct
+import zlib
+import numpy as np
+
+PLATFORMS = ("pc", "ps2", "psp")
+# PS2 pieces store their counters in a single byte
+PIECE_VERTICES = 200
+PS2_TRIANGLES_TAG = bytes([0x01, 0x00, 0x00, 0x05, 0x01, 0x01, 0x00, 0x01])
+
+
+def grid_strip(width:int, height:int):
+    """
+    Triangle strip over a width x height grid of vertices, the rows are joined by degenerate triangles
+    """
+    strip = []
+    for row in range(height - 1):
+        if row:
+            # repeat the last index and the first one of the next row
+            strip += [strip[-1], row * width]
+        for column in range(width):
+            strip += [row * width + column, (row + 1) * width + column]
+    return np.array(strip, dtype=np.int64)
+
+def grid(vertex_count:int, offset:float=0.0):
+    """
+    Positions, normals, uvs and strip of a wavy grid with about vertex_count vertices
+    """
+    width = max(2, int(vertex_count ** 0.5))
+    height = max(2, vertex_count // width)
+    v, u = np.mgrid[0:height, 0:width]
+    u = (u / (width - 1)).ravel()
+    v = (v / (height - 1)).ravel()
+    positions = np.stack((u - 0.5 + offset, v - 0.5, np.sin(u * 3) * 0.1), axis=1)
+    normals = np.tile([0.0, 0.0, 1.0], (len(positions), 1))
+    uvs = np.stack((u, v), axis=1)
+    return positions, normals, uvs, grid_strip(width, height)
+
+def piece_grids(vertex_count:int):
+    pieces = max(1, -(-vertex_count // PIECE_VERTICES))
+    return [grid(min(PIECE_VERTICES, vertex_count), i) for i in range(pieces)]
+
+def to_int16(array):
+    return np.clip(np.round(array), -32768, 32767).astype("<i2")
+
+def pc_model(vertex_count:int):
+    positions, normals, uvs, strip = grid(vertex_count)
+    parts_counter_address = 32
+    vertex_start_address = parts_counter_address + 16
+    records = np.zeros(len(positions), dtype=[("position", "<f4", (3,)), ("normal", "<f4", (3,)), ("uv", "<f4", (2,))])
+    records["position"] = positions[:, ::-1] * 32
+    records["normal"] = normals[:, ::-1] * 40
+    records["uv"] = uvs
+    poly_faces_address = vertex_start_address + records.nbytes
+    model = bytearray(poly_faces_address + 2)
+    model[0:4] = bytes([0x20, 0x05, 0x04, 0x20])
+    struct.pack_into("<2I", model, 16, parts_counter_address, poly_faces_address)
+    struct.pack_into("<I", model, parts_counter_address, 1)
+    struct.pack_into("<H", model, parts_counter_address + 8, len(positions))
+    model[vertex_start_address : poly_faces_address] = records.tobytes()
+    struct.pack_into("<H", model, poly_faces_address, len(strip))
+    model += strip.astype("<u2").tobytes()
+    return model
+
+def pieces_model(pieces:list):
+    """
+    PS2/PSP model header followed by its pieces
+    """
+    header_size = 48
+    pieces_bytes = b"".join(pieces)
+    model = bytearray(header_size) + pieces_bytes
+    model[0:4] = bytes([0x03, 0x00, 0xFF, 0xFF])
+    struct.pack_into("<2I", model, 32, len(pieces), header_size)
+    struct.pack_into("<I", model, 44, header_size + len(pieces_bytes))
+    return model
+
+def ps2_piece(positions, normals, uvs, strip):
+    vertices = len(positions)
+    # the counters move two bytes further when the vertex count is odd
+    sum1, sum2 = (4, 6) if vertices % 2 else (2, 4)
+    piece = bytearray(100)
+    piece[98] = vertices
+    for data, factor in ((positions, 0.001953), (normals, 0.001953)):
+        piece += to_int16(data / factor * [1, -1, 1]).tobytes()
+        counter_address = len(piece) + sum1
+        piece += bytes(sum2)
+        # the counter after a block is the size of the next one
+        piece[counter_address] = vertices
+    piece += to_int16(np.stack((uvs[:, 0], 1 - uvs[:, 1]), axis=1) / 0.000244).tobytes()
+    # strip indices are one based, four times the index and a multiple of four long
+    strip = np.concatenate((strip, np.repeat(strip[-1:], -len(strip) % 4)))
+    piece += PS2_TRIANGLES_TAG + bytes([0, 0, len(strip) // 4, 0])
+    piece += ((strip + 1) * 4).astype("<u2").tobytes()
+    piece += bytes(-len(piece) % 16)
+    struct.pack_into("<I", piece, 0, len(piece))
+    return bytes(piece)
+
+def ps2_model(vertex_count:int):
+    return pieces_model([ps2_piece(*piece_grid) for piece_grid in piece_grids(vertex_count)])
+
+def psp_piece(positions, normals, uvs, strip):
+    # the normal encoding of the PSP is not known, its two int16 are left zero
+    records = np.zeros(len(positions), dtype=[("uv", "<i2", (2,)), ("normal", "<i2", (2,)), ("position", "<i2", (3,))])
+    records["uv"] = to_int16(np.stack((uvs[:, 0], 1 - uvs[:, 1]), axis=1) / 0.000244 - 32768)
+    records["position"] = to_int16((positions + [0, 0.749928, 0]) / 0.001953 * [1, -1, 1])[:, ::-1]
+    tri_start_address = 96 + records.nbytes
+    piece = bytearray(tri_start_address) + strip.astype("<u2").tobytes()
+    piece += bytes(-len(piece) % 16)
+    struct.pack_into("<5I", piece, 0, len(piece), 0, 96, tri_start_address, len(strip))
+    struct.pack_into("<H", piece, 92, len(positions))
+    piece[96 : tri_start_address] = records.tobytes()
+    return bytes(piece)
+
+def psp_model(vertex_count:int):
+    return pieces_model([psp_piece(*piece_grid) for piece_grid in piece_grids(vertex_count)])
+
+def pes_texture(width:int, height:int):
+    """
+    8 bits PES image with a gradient palette and a pattern of pixels
+    """
+    header_size = 64
+    palette = np.zeros((256, 4), dtype=np.uint8)
+    palette[:, 0] = np.arange(256)
+    palette[:, 1] = 255 - np.arange(256)
+    palette[:, 2] = np.arange(256) // 2
+    palette[:, 3] = 128
+    pixels = (np.add.outer(np.arange(height), np.arange(width)) % 256).astype(np.uint8)
+    idat_start = header_size + palette.nbytes
+    size = idat_start + pixels.nbytes
+    texture = bytearray(header_size)
+    texture[0:4] = bytes([0x94, 0x72, 0x85, 0x29])
+    struct.pack_into("<I", texture, 8, size)
+    struct.pack_into("<4H", texture, 16, idat_start, header_size, width, height)
+    return texture + palette.tobytes() + pixels.tobytes()
+
+def container(files:list):
+    table_offset = 8
+    offset = table_offset + 4 * len(files)
+    offsets = []
+    for file in files:
+        offset += -offset % 16
+        offsets.append(offset)
+        offset += len(file)
+    container_bytes = bytearray(offset)
+    struct.pack_into(f"<2I{len(files)}I", container_bytes, 0, len(files), table_offset, *offsets)
+    for file_offset, file in zip(offsets, files):
+        container_bytes[file_offset : file_offset + len(file)] = file
+    return container_bytes
+
+MODELS = {"pc": pc_model, "ps2": ps2_model, "psp": psp_model}
+
+def model(platform:str, vertex_count:int):
+    return MODELS[platform](vertex_count)
+
+def bin_file(platform:str, vertex_count:int=2000, texture_size:int=128):
+    """
+    Whole face .bin, a 32 bytes header and the compressed container of the model and its texture
+    """
+    container_bytes = container([model(platform, vertex_count), pes_texture(texture_size, texture_size)])
+    payload = zlib.compress(container_bytes)
+    # magic, compressed size and inflated size
+    header = struct.pack("<8s2I", b"\x00\x01\x01WESYS", len(payload), len(container_bytes)).ljust(32, b"\x00")
+    return header + payload
+
+def afs_file(files:list, names:list=None):
+    """
+    AFS archive of the given files aligned to 2048 bytes, with the names table after the last file
+    when names are given
+    """
+    header_size = 8 + 8 * len(files) + 8
+    offset = header_size + -header_size % 2048
+    table = []
+    for file in files:
+        table.append((offset, len(file)))
+        offset += len(file) + -len(file) % 2048
+    names_table = b""
+    if names is not None:
+        names_table = b"".join(struct.pack("<32s6HI", name.encode("ascii"), 0, 0, 0, 0, 0, 0, len(file)) for name, file in zip(names, files))
+    archive = bytearray(offset + len(names_table))
+    struct.pack_into("<4sI", archive, 0, b"AFS\x00", len(files))
+    for i, ((file_offset, size), file) in enumerate(zip(table, files)):
+        struct.pack_into("<2I", archive, 8 + 8 * i, file_offset, size)
+        archive[file_offset : file_offset + size] = file
+    if names is not None:
+        struct.pack_into("<2I", archive, 8 + 8 * len(files), offset, len(names_table))
+        archive[offset:] = names_table
+    return archive
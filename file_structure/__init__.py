@@ -1,4 +1,29 @@
-from .utils.common_functions import file_read, zlib_it, unzlib_it
-from .container import Container
-from .models import FacePCModel, FacePS2Model
-from .image import PESImage, PNGImage
\ No newline at end of file
+import importlib
+
+# the submodules are only imported when one of their names is used, so a metadata query
+# does not pay for the geometry or image code
+_EXPORTS = {
+    "file_read": ".utils.common_functions",
+    "file_unzlib": ".utils.common_functions",
+    "zlib_it": ".utils.common_functions",
+    "unzlib_it": ".utils.common_functions",
+    "Container": ".container",
+    "Mesh": ".mesh",
+    "FacePCModel": ".models",
+    "FacePS2Model": ".models",
+    "FacePSPModel": ".models",
+    "detect_model": ".detection",
+    "PESImage": ".image",
+    "PNGImage": ".image",
+}
+__all__ = list(_EXPORTS)
+
+def __getattr__(name:str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
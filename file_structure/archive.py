@@ -0,0 +1,104 @@
+import mmap
+import struct
+from collections import namedtuple
+from pathlib import Path
+from .detection import is_model_bin
+
+ArchiveEntry = namedtuple("ArchiveEntry", ["index", "name", "offset", "size"])
+
+
+class AFSArchive:
+    """
+    AFS archive of the games, as 0_text.afs, read through mmap. The entries are memoryview slices
+    of the mapped file so a .bin is never copied or extracted before it is inflated, the views
+    stay valid until the archive is closed and have to be released or dropped before that
+    """
+    MAGIC = b"AFS\x00"
+    # name, six u16 date fields and the size of the file
+    NAME_ENTRY = struct.Struct("<32s6HI")
+
+    def __init__(self, file_location:str):
+        self.file_location = file_location
+        with open(file_location, "rb") as archive_file:
+            self.archive_map = mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.archive_bytes = memoryview(self.archive_map)
+        try:
+            self.load_entries()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def close(self):
+        if self.archive_map is not None:
+            self.archive_bytes.release()
+            self.archive_map.close()
+            self.archive_map = None
+
+    def load_entries(self):
+        """
+        Load the offset and size of every file and their names when the archive has a names table
+        """
+        if self.archive_bytes[:4] != self.MAGIC:
+            raise ValueError("Not an AFS archive!")
+        total_files = struct.unpack_from("<I", self.archive_bytes, 4)[0]
+        table = struct.unpack_from(f"<{2 * total_files}I", self.archive_bytes, 8)
+        offsets, sizes = table[0::2], table[1::2]
+        for offset, size in zip(offsets, sizes):
+            if offset + size > len(self.archive_bytes):
+                raise ValueError("AFS entry goes past the end of the archive!")
+        names = self.load_names(total_files, offsets)
+        self.entries = [
+            ArchiveEntry(i, names[i] if names else f"{Path(self.file_location).stem}_{i:05d}", offsets[i], sizes[i])
+            for i in range(total_files)
+        ]
+
+    def load_names(self, total_files:int, offsets:tuple):
+        """
+        Names of the files, the pointer to their table follows the files table or, in some
+        archives, sits just before the first file
+        """
+        candidates = [8 + 8 * total_files]
+        if offsets:
+            candidates.append(min(offsets) - 8)
+        for pointer in candidates:
+            if pointer + 8 > len(self.archive_bytes):
+                continue
+            names_offset, names_size = struct.unpack_from("<2I", self.archive_bytes, pointer)
+            if names_offset and names_size >= total_files * self.NAME_ENTRY.size and names_offset + names_size <= len(self.archive_bytes):
+                return [
+                    self.NAME_ENTRY.unpack_from(self.archive_bytes, names_offset + i * self.NAME_ENTRY.size)[0]
+                    .split(b"\x00", 1)[0].decode("ascii", "replace")
+                    for i in range(total_files)
+                ]
+        return None
+
+    def entry_bytes(self, entry:ArchiveEntry):
+        """
+        View of the bytes of an entry, a .bin can go straight to file_structure.Container after
+        inflating the view from its 32nd byte
+        """
+        return self.archive_bytes[entry.offset : entry.offset + entry.size]
+
+    def models(self):
+        """
+        (entry, view) of every face or hair .bin of the archive, the others are skipped after
+        inflating their container header only
+        """
+        for entry in self.entries:
+            view = self.entry_bytes(entry)
+            if entry.size > 32 and is_model_bin(view):
+                yield entry, view
+            else:
+                view.release()
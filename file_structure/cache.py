@@ -0,0 +1,113 @@
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from .utils.common_functions import file_digest
+
+
+class ConversionCache:
+    """
+    On disk cache of converted files, an entry is keyed by the hash of the compressed
+    payload of a .bin (the bytes after offset 32), its file name and the exporter options.
+    The produced artifacts are copied into the cache by extension so they can be restored next
+    to any .bin with the same name and bytes, the least recently used entries are evicted once
+    the stored artifacts go over max_bytes
+    """
+    VERSION = 2
+    INDEX_NAME = "index.json"
+    HASH_CHUNK = 1 << 20
+
+    def __init__(self, cache_folder:str, max_bytes:int=1 << 30):
+        self.cache_folder = Path(cache_folder)
+        self.max_bytes = max_bytes
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_folder / self.INDEX_NAME
+        self.load_index()
+
+    def load_index(self):
+        self.index = {}
+        if self.index_path.is_file():
+            with open(self.index_path, "r", encoding="utf-8") as index_file:
+                index = json.load(index_file)
+            if index.get("version") == self.VERSION:
+                self.index = index["entries"]
+
+    def save_index(self):
+        # written aside and moved so an interrupted run never leaves a broken index
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            json.dump({"version": self.VERSION, "entries": self.index}, index_file)
+        os.replace(tmp_path, self.index_path)
+
+    @property
+    def total_bytes(self):
+        return sum(entry["size"] for entry in self.index.values())
+
+    def key(self, file_location:str, options:dict):
+        """
+        Hash of the compressed payload of a .bin, its name and the options used to export it.
+        The name is part of the key since the obj refers to its mtl and png by name
+        """
+        digest = file_digest(file_location, 32, self.HASH_CHUNK)
+        digest.update(json.dumps(dict(options, name=Path(file_location).stem), sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup(self, key:str, file_location:str):
+        """
+        Return the artifacts of a cached conversion next to file_location, the missing or modified
+        ones are restored from the cache. None when the key is unknown or its artifacts are gone
+        """
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        entry_folder = self.cache_folder / key
+        artifacts = []
+        for suffix, size in zip(entry["suffixes"], entry["sizes"]):
+            artifact = str(Path(file_location).with_suffix(suffix))
+            artifacts.append(artifact)
+            if os.path.isfile(artifact) and os.path.getsize(artifact) == size:
+                continue
+            cached_artifact = entry_folder / f"artifact{suffix}"
+            if not cached_artifact.is_file():
+                self.remove(key)
+                return None
+            shutil.copyfile(cached_artifact, artifact)
+        entry["last_used"] = time.time()
+        return artifacts
+
+    def store(self, key:str, artifacts:list):
+        """
+        Copy the artifacts of a conversion into the cache by extension and evict old entries if needed
+        """
+        entry_folder = self.cache_folder / key
+        entry_folder.mkdir(exist_ok=True)
+        suffixes = []
+        sizes = []
+        for artifact in artifacts:
+            suffix = Path(artifact).suffix
+            shutil.copyfile(artifact, entry_folder / f"artifact{suffix}")
+            suffixes.append(suffix)
+            sizes.append(os.path.getsize(artifact))
+        self.index[key] = {
+            "suffixes": suffixes,
+            "sizes": sizes,
+            "size": sum(sizes),
+            "last_used": time.time(),
+        }
+        self.evict()
+
+    def remove(self, key:str):
+        self.index.pop(key, None)
+        shutil.rmtree(self.cache_folder / key, ignore_errors=True)
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits in max_bytes
+        """
+        total_bytes = self.total_bytes
+        for key in sorted(self.index, key=lambda key: self.index[key]["last_used"]):
+            if total_bytes <= self.max_bytes:
+                break
+            total_bytes -= self.index[key]["size"]
+            self.remove(key)
@@ -0,0 +1,168 @@
+import glob
+import os
+import sqlite3
+from pathlib import Path
+from .container import Container, is_hair, texture_index
+from .detection import detect_model, is_model_bin
+from .image import PESImage
+from .models import FacePCModel, FacePS2Model, FacePSPModel
+from .utils.common_functions import file_digest, file_unzlib, to_int
+
+PLATFORM_NAMES = {FacePCModel: "pc", FacePS2Model: "ps2", FacePSPModel: "psp"}
+COLUMNS = (
+    "path", "size", "mtime", "hash", "platform", "confidence", "kind",
+    "pieces", "vertices", "faces", "texture_width", "texture_height", "error",
+)
+
+
+def describe_bin(file_location:str, digest:str=None):
+    """
+    Catalogue row of a .bin, the model is only parsed down to its counts and the texture
+    down to its header. Errors are stored in the row instead of raised
+    """
+    stat = os.stat(file_location)
+    row = dict.fromkeys(COLUMNS)
+    row.update(
+        path=file_location,
+        size=stat.st_size,
+        mtime=stat.st_mtime,
+        hash=digest or file_digest(file_location).hexdigest(),
+    )
+    try:
+        if not is_model_bin(file_location):
+            raise ValueError("Not a face or hair model!")
+        file_ctn = Container(file_unzlib(file_location, 32))
+        model_bytes = file_ctn.get_file(0)
+        model_class, confidence = detect_model(model_bytes)
+        summary = model_class(model_bytes).summary()
+        row.update(
+            platform=PLATFORM_NAMES[model_class],
+            confidence=confidence,
+            kind="hair" if is_hair(file_ctn.files) else "face",
+            pieces=summary["pieces"],
+            vertices=summary["vertices"],
+            faces=summary["faces"],
+        )
+        texture = file_ctn.files[texture_index(file_ctn.files)]
+        if texture[:4] == PESImage.PES_IMAGE_SIGNATURE:
+            row.update(texture_width=to_int(texture[20:22]), texture_height=to_int(texture[22:24]))
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+class Catalogue:
+    """
+    SQLite index of face/hair .bin files with their platform, kind, counts and texture size.
+    Scans are incremental, a file is only parsed again when its size or mtime changed and
+    its hash is not the one already recorded
+    """
+
+    def __init__(self, db_path:str):
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.create_tables()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def create_tables(self):
+        with self.connection:
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    hash TEXT NOT NULL,
+                    platform TEXT,
+                    confidence REAL,
+                    kind TEXT,
+                    pieces INTEGER,
+                    vertices INTEGER,
+                    faces INTEGER,
+                    texture_width INTEGER,
+                    texture_height INTEGER,
+                    error TEXT
+                )
+                """
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS files_platform_kind ON files (platform, kind, vertices)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS files_hash ON files (hash)")
+
+    def scan(self, paths:list, workers:int=None):
+        """
+        Index every .bin under the given folders, files or glob patterns, returns how many rows were
+        (added or updated, unchanged, removed). Rows of files that disappeared from a scanned folder are removed
+        """
+        known = {row["path"]: row for row in self.connection.execute("SELECT path, size, mtime, hash FROM files")}
+        seen = set()
+        pending = []
+        refreshed = []
+        for file_location in self.find_files(paths):
+            seen.add(file_location)
+            stat = os.stat(file_location)
+            row = known.get(file_location)
+            if row is not None and row["size"] == stat.st_size and row["mtime"] == stat.st_mtime:
+                continue
+            digest = file_digest(file_location).hexdigest()
+            if row is not None and row["hash"] == digest:
+                # touched but not changed
+                refreshed.append((stat.st_mtime, file_location))
+            else:
+                pending.append((file_location, digest))
+        rows = []
+        if pending:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                rows = list(executor.map(describe_bin, *zip(*pending), chunksize=16))
+        removed = [
+            (path,) for path in known
+            if path not in seen and any(self.is_under(path, root) for root in paths)
+        ]
+        with self.connection:
+            self.connection.executemany("UPDATE files SET mtime = ? WHERE path = ?", refreshed)
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO files ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                [tuple(row[column] for column in COLUMNS) for row in rows],
+            )
+            self.connection.executemany("DELETE FROM files WHERE path = ?", removed)
+        return len(rows) + len(refreshed), len(seen) - len(rows) - len(refreshed), len(removed)
+
+    @staticmethod
+    def find_files(paths:list):
+        for path in paths:
+            if Path(path).is_dir():
+                yield from sorted(str(bin_file.resolve()) for bin_file in Path(path).rglob("*.bin"))
+            else:
+                yield from sorted(str(Path(bin_file).resolve()) for bin_file in glob.glob(path, recursive=True))
+
+    @staticmethod
+    def is_under(file_location:str, root:str):
+        root = Path(root).resolve()
+        return Path(file_location) == root or root in Path(file_location).parents
+
+    def query(self, platform:str=None, kind:str=None, min_vertices:int=None, max_vertices:int=None, with_errors:bool=False):
+        """
+        Rows matching every given filter as dicts, e.g. query("ps2", "hair", min_vertices=2000)
+        """
+        conditions, parameters = [], []
+        for condition, value in (
+            ("platform = ?", platform),
+            ("kind = ?", kind),
+            ("vertices >= ?", min_vertices),
+            ("vertices <= ?", max_vertices),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        if not with_errors:
+            conditions.append("error IS NULL")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return [dict(row) for row in self.connection.execute(f"SELECT * FROM files {where} ORDER BY path", parameters)]
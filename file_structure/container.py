@@ -1,36 +1,124 @@
-from .utils.common_functions import to_int
+import mmap
+import struct
+from collections import namedtuple
+from .image import PESImage
+from .utils.common_functions import InflateStream, to_int
+
+ContainerHeader = namedtuple("ContainerHeader", ["total_files", "files_offset", "first_magic", "inflated_bytes"])
+# far more than any face or hair container has, a bigger count means the bytes are not a container
+MAX_CONTAINER_FILES = 64
 
 
 class Container:
+    """
+    Index of the files inside a container, each entry is a memoryview slice of the
+    container bytes so nothing is copied until an entry is materialized with get_file
+    """
 
     def __init__(self,container_bytes: bytearray):
-        self.container_bytes = container_bytes
-        self.total_files = to_int(container_bytes[:4])
-        self.idx_tbl_offset = to_int(container_bytes[4:8])
+        self.container_bytes = memoryview(container_bytes)
+        self.container_map = None
+        self.total_files = to_int(self.container_bytes[:4])
+        self.idx_tbl_offset = to_int(self.container_bytes[4:8])
         self.load_files_table()
         self.load_files()
-    
+
+    @classmethod
+    def from_file(cls, file_location:str, offset:int=0):
+        """
+        Open an uncompressed container through mmap, the entries are views over the mapped file
+        and stay valid until the container is closed
+        """
+        with open(file_location, "rb") as container_file:
+            container_map = mmap.mmap(container_file.fileno(), 0, access=mmap.ACCESS_READ)
+        container = cls(memoryview(container_map)[offset:])
+        container.container_map = container_map
+        return container
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the entry views and the mapped file if there is one
+        """
+        for file in self.files:
+            file.release()
+        self.files = []
+        self.container_bytes.release()
+        if self.container_map is not None:
+            self.container_map.close()
+            self.container_map = None
+
     def load_files_table(self):
         """
         Load the start offset for each file in the container
         """
-        self.files_offset = []
-        for i in range(self.total_files):
-            offset = to_int(self.container_bytes[
-                self.idx_tbl_offset + i * 4 : self.idx_tbl_offset + i * 4 + 4
-                ])
-            self.files_offset.append(offset)
+        self.files_offset = list(struct.unpack_from(f"<{self.total_files}I", self.container_bytes, self.idx_tbl_offset))
 
     def load_files(self):
         """
-        Load each file into a list
+        Load a view of each file into a list
         """
         self.files = []
         for i in range(self.total_files):
             if i == self.total_files -1:
-                offset = bytearray(self.container_bytes[self.files_offset[i] : ])
+                file = self.container_bytes[self.files_offset[i] : ]
             else:
-                offset = bytearray(self.container_bytes[
+                file = self.container_bytes[
                     self.files_offset[i] : self.files_offset[i + 1]
-                    ])
-            self.files.append(offset)
+                    ]
+            self.files.append(file)
+
+    @staticmethod
+    def pack(files:list, alignment:int=16):
+        """
+        Build the bytes of a container holding the given files, each one aligned to alignment bytes
+        """
+        idx_tbl_offset = 8
+        offset = idx_tbl_offset + 4 * len(files)
+        files_offset = []
+        for file in files:
+            offset += -offset % alignment
+            files_offset.append(offset)
+            offset += len(file)
+        container_bytes = bytearray(offset)
+        struct.pack_into(f"<2I{len(files)}I", container_bytes, 0, len(files), idx_tbl_offset, *files_offset)
+        for file_offset, file in zip(files_offset, files):
+            container_bytes[file_offset : file_offset + len(file)] = file
+        return container_bytes
+
+    def get_file(self, i:int):
+        """
+        Materialize an entry into its own bytearray
+        """
+        return bytearray(self.files[i])
+
+
+def peek_container(bin_file, offset:int=32):
+    """
+    Header, files table and magic number of the first entry of the compressed container of a .bin,
+    given by its path or its bytes. Only the bytes up to that magic number are inflated
+    """
+    with InflateStream(bin_file, offset) as stream:
+        total_files, idx_tbl_offset = struct.unpack("<2I", stream.read(0, 8))
+        if not 0 < total_files <= MAX_CONTAINER_FILES:
+            raise ValueError(f"Not a container, it says it has {total_files} files!")
+        files_offset = list(struct.unpack(f"<{total_files}I", stream.read(idx_tbl_offset, 4 * total_files)))
+        first_magic = stream.read(files_offset[0], 4)
+        return ContainerHeader(total_files, files_offset, first_magic, len(stream.data))
+
+def is_hair(list_of_files:list):
+    """
+    Hair containers have three files with the texture in the middle one
+    """
+    if len(list_of_files) == 3:
+        return PESImage.PES_IMAGE_SIGNATURE == list_of_files[1][:4]
+    else:
+        return False
+
+def texture_index(list_of_files:list):
+    return 1 if is_hair(list_of_files) else len(list_of_files) - 1
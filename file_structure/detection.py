@@ -0,0 +1,87 @@
+import zlib
+from .container import peek_container
+from .models import FacePCModel, FacePS2Model, FacePSPModel
+from .utils.common_functions import to_int
+
+# the triangle strip of a PS2 piece always comes after this vif tag
+PS2_TRIANGLES_TAG = bytearray([0x01, 0x00, 0x00, 0x05, 0x01, 0x01, 0x00, 0x01])
+
+
+def detect_model(model_bytes:bytes):
+    """
+    Guess the model class of a container entry from its header and the layout of its pieces
+    without decoding any geometry, returns a (model class, confidence) tuple where confidence
+    goes from 0 to 1
+    """
+    if model_bytes[:4] == FacePCModel.magic_number:
+        return FacePCModel, 1.0
+    if model_bytes[:4] != FacePS2Model.magic_number:
+        raise ValueError("Unknown face model!")
+    # PS2 and PSP share the magic number, so every piece is checked against both layouts
+    pieces = model_pieces(model_bytes)
+    if not pieces:
+        raise ValueError("Face model without pieces!")
+    ps2_score = sum(is_ps2_piece(piece) for piece in pieces) / len(pieces)
+    psp_score = sum(is_psp_piece(piece) for piece in pieces) / len(pieces)
+    if ps2_score == psp_score == 0:
+        raise ValueError("Pieces do not match any known platform!")
+    if ps2_score >= psp_score:
+        return FacePS2Model, ps2_score * (1 - psp_score / 2)
+    return FacePSPModel, psp_score * (1 - ps2_score / 2)
+
+def is_model_bin(bin_file):
+    """
+    Whether a .bin, given by its path or its bytes, holds a face or hair model. Only its container
+    header and the magic number of the model are inflated so files of any other kind are rejected cheaply
+    """
+    try:
+        header = peek_container(bin_file)
+    except (ValueError, zlib.error):
+        return False
+    return header.first_magic in (FacePCModel.magic_number, FacePS2Model.magic_number)
+
+def model_pieces(model_bytes:bytes):
+    """
+    Split the pieces of a PS2/PSP model the same way the models do, stopping at the
+    first piece that does not fit in the pieces block
+    """
+    pieces_total = to_int(model_bytes[32 : 36])
+    pieces_start_address = to_int(model_bytes[36 : 40])
+    pieces_end_address = to_int(model_bytes[44 : 48])
+    pieces = []
+    address = pieces_start_address
+    for _ in range(pieces_total):
+        piece_size = to_int(model_bytes[address : address + 4])
+        if piece_size < 96 or address + piece_size > pieces_end_address:
+            break
+        pieces.append(model_bytes[address : address + piece_size])
+        address += piece_size
+    return pieces
+
+def is_ps2_piece(piece:bytes):
+    """
+    A PS2 piece has its vertex counter after the header pointed by the piece and carries
+    the vif tag of the triangle strip
+    """
+    vertex_counter_address = to_int(piece[8:12]) + 96 + 2
+    if vertex_counter_address >= len(piece):
+        return False
+    vertex_in_piece = piece[vertex_counter_address]
+    return (
+        vertex_in_piece > 0
+        and vertex_counter_address + 2 + vertex_in_piece * 6 <= len(piece)
+        and piece.find(PS2_TRIANGLES_TAG) != -1
+    )
+
+def is_psp_piece(piece:bytes):
+    """
+    A PSP piece stores interleaved 14 bytes vertex records and an optional strip
+    that must fit inside the piece
+    """
+    vertex_in_piece = to_int(piece[92:94])
+    uv_start_address = to_int(piece[8:12])
+    tri_start_address = to_int(piece[12:16])
+    tri_list_size = to_int(piece[16:20])
+    if vertex_in_piece == 0 or uv_start_address + vertex_in_piece * FacePSPModel.data_size > len(piece):
+        return False
+    return tri_start_address == 0 or tri_start_address + tri_list_size * 2 <= len(piece)
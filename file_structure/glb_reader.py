@@ -0,0 +1,94 @@
+import json
+import struct
+import numpy as np
+from .mesh import Mesh
+
+
+class GLBReader:
+    """
+    Binary glTF 2.0 reader, the triangle primitives of every mesh are merged into a single mesh
+    and the first base color texture is kept as png bytes. Node transforms are not applied
+    """
+    GLB_MAGIC = b"glTF"
+    JSON_CHUNK = b"JSON"
+    BIN_CHUNK = b"BIN\x00"
+    TRIANGLES = 4
+    COMPONENT_TYPES = {5120: "i1", 5121: "u1", 5122: "<i2", 5123: "<u2", 5125: "<u4", 5126: "<f4"}
+    TYPE_SIZES = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}
+
+    def __init__(self, file_path:str):
+        self.file_path = file_path
+        self.gltf = None
+        self.bin_chunk = b""
+        self.png = None
+
+    def read(self):
+        with open(self.file_path, "rb") as glb_file:
+            glb_bytes = glb_file.read()
+        if glb_bytes[:4] != self.GLB_MAGIC:
+            raise ValueError("Not a binary gltf file!")
+        offset = 12
+        while offset < len(glb_bytes):
+            chunk_length, chunk_type = struct.unpack_from("<I4s", glb_bytes, offset)
+            chunk = glb_bytes[offset + 8 : offset + 8 + chunk_length]
+            if chunk_type == self.JSON_CHUNK:
+                self.gltf = json.loads(chunk)
+            elif chunk_type == self.BIN_CHUNK:
+                self.bin_chunk = chunk
+            offset += 8 + chunk_length
+        positions, normals, uvs, faces = [], [], [], []
+        vertex_offset = 0
+        for mesh in self.gltf.get("meshes", []):
+            for primitive in mesh["primitives"]:
+                if primitive.get("mode", self.TRIANGLES) != self.TRIANGLES:
+                    continue
+                attributes = primitive["attributes"]
+                primitive_positions = self.accessor(attributes["POSITION"])
+                count = len(primitive_positions)
+                positions.append(primitive_positions)
+                if "NORMAL" in attributes:
+                    normals.append(self.accessor(attributes["NORMAL"]))
+                if "TEXCOORD_0" in attributes:
+                    # gltf has the uv origin at the top left corner, the mesh follows the obj convention
+                    primitive_uvs = self.accessor(attributes["TEXCOORD_0"]).astype(np.float64)
+                    primitive_uvs[:, 1] = 1 - primitive_uvs[:, 1]
+                    uvs.append(primitive_uvs)
+                indices = self.accessor(primitive["indices"]) if "indices" in primitive else np.arange(count)
+                faces.append(indices.astype(np.int64).reshape(-1, 3) + vertex_offset)
+                vertex_offset += count
+                if self.png is None and "material" in primitive:
+                    self.png = self.material_png(primitive["material"])
+        # an attribute some primitive lacks is left out, so the normals get computed instead of zeroed
+        return Mesh.from_pieces(
+            positions,
+            normals if len(normals) == len(positions) else [],
+            uvs if len(uvs) == len(positions) else [],
+            faces,
+        )
+
+    def buffer_view(self, index:int):
+        buffer_view = self.gltf["bufferViews"][index]
+        return buffer_view, buffer_view.get("byteOffset", 0)
+
+    def accessor(self, index:int):
+        """
+        Array of an accessor, following the stride of its buffer view
+        """
+        accessor = self.gltf["accessors"][index]
+        dtype = np.dtype(self.COMPONENT_TYPES[accessor["componentType"]])
+        width = self.TYPE_SIZES[accessor["type"]]
+        buffer_view, offset = self.buffer_view(accessor["bufferView"])
+        offset += accessor.get("byteOffset", 0)
+        stride = buffer_view.get("byteStride", dtype.itemsize * width)
+        array = np.ndarray((accessor["count"], width), dtype, buffer=self.bin_chunk, offset=offset, strides=(stride, dtype.itemsize))
+        return array.copy() if width > 1 else array.ravel().copy()
+
+    def material_png(self, index:int):
+        texture = self.gltf["materials"][index].get("pbrMetallicRoughness", {}).get("baseColorTexture")
+        if texture is None:
+            return None
+        image = self.gltf["images"][self.gltf["textures"][texture["index"]]["source"]]
+        if image.get("mimeType") != "image/png" or "bufferView" not in image:
+            return None
+        buffer_view, offset = self.buffer_view(image["bufferView"])
+        return self.bin_chunk[offset : offset + buffer_view["byteLength"]]
@@ -0,0 +1,121 @@
+import json
+import struct
+import numpy as np
+from .mesh import Mesh
+
+
+class GLBWriter:
+    """
+    Binary glTF 2.0 writer, the mesh arrays and the png textures are copied as they are
+    into the binary chunk so there is no float to text conversion at all
+    """
+    GLB_MAGIC = b"glTF"
+    GLB_VERSION = 2
+    JSON_CHUNK = b"JSON"
+    BIN_CHUNK = b"BIN\x00"
+    ARRAY_BUFFER = 34962
+    ELEMENT_ARRAY_BUFFER = 34963
+    FLOAT = 5126
+    UNSIGNED_INT = 5125
+
+    def __init__(self):
+        self.gltf = {
+            "asset": {"version": "2.0", "generator": "PES/WE/JL Model Tool"},
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "materials": [],
+            "textures": [],
+            "images": [],
+            "samplers": [{}],
+            "accessors": [],
+            "bufferViews": [],
+            "buffers": [],
+        }
+        self.chunks = []
+        self.bin_length = 0
+
+    def add_mesh(self, mesh:Mesh, name:str, png:bytes=None):
+        """
+        Add a mesh as a new node of the scene, with its texture embedded when a png is given
+        """
+        positions = mesh.positions.astype("<f4", copy=False)
+        attributes = {
+            "POSITION": self.add_accessor(
+                positions, "VEC3", self.ARRAY_BUFFER,
+                min=positions.min(axis=0).tolist() if len(positions) else [0, 0, 0],
+                max=positions.max(axis=0).tolist() if len(positions) else [0, 0, 0],
+            ),
+        }
+        if mesh.has_normals:
+            # gltf requires unit normals, the games store them scaled
+            lengths = np.linalg.norm(mesh.normals, axis=1, keepdims=True)
+            normals = np.divide(mesh.normals, lengths, out=np.zeros_like(mesh.normals), where=lengths > 0)
+            attributes["NORMAL"] = self.add_accessor(normals.astype("<f4"), "VEC3", self.ARRAY_BUFFER)
+        if len(mesh.uvs) == len(mesh.positions):
+            # the mesh uvs follow the obj convention, gltf has the origin at the top left corner
+            uvs = mesh.uvs.astype("<f4")
+            uvs[:, 1] = 1 - uvs[:, 1]
+            attributes["TEXCOORD_0"] = self.add_accessor(uvs, "VEC2", self.ARRAY_BUFFER)
+        primitive = {
+            "attributes": attributes,
+            "indices": self.add_accessor(mesh.faces.astype("<u4", copy=False).ravel(), "SCALAR", self.ELEMENT_ARRAY_BUFFER),
+        }
+        if png is not None:
+            primitive["material"] = self.add_material(png, name)
+        self.gltf["meshes"].append({"name": name, "primitives": [primitive]})
+        self.gltf["nodes"].append({"name": name, "mesh": len(self.gltf["meshes"]) - 1})
+        self.gltf["scenes"][0]["nodes"].append(len(self.gltf["nodes"]) - 1)
+
+    def add_material(self, png:bytes, name:str):
+        self.gltf["images"].append({"bufferView": self.add_buffer_view(png), "mimeType": "image/png"})
+        self.gltf["textures"].append({"sampler": 0, "source": len(self.gltf["images"]) - 1})
+        self.gltf["materials"].append({
+            "name": name,
+            "pbrMetallicRoughness": {
+                "baseColorTexture": {"index": len(self.gltf["textures"]) - 1},
+                "metallicFactor": 0,
+            },
+        })
+        return len(self.gltf["materials"]) - 1
+
+    def add_accessor(self, array:np.ndarray, accessor_type:str, target:int, **bounds):
+        accessor = {
+            "bufferView": self.add_buffer_view(array, target),
+            "componentType": self.UNSIGNED_INT if array.dtype.kind == "u" else self.FLOAT,
+            "count": len(array),
+            "type": accessor_type,
+        }
+        accessor.update(bounds)
+        self.gltf["accessors"].append(accessor)
+        return len(self.gltf["accessors"]) - 1
+
+    def add_buffer_view(self, data, target:int=None):
+        data = memoryview(np.ascontiguousarray(data)).cast("B") if isinstance(data, np.ndarray) else memoryview(data)
+        buffer_view = {"buffer": 0, "byteOffset": self.bin_length, "byteLength": len(data)}
+        if target is not None:
+            buffer_view["target"] = target
+        self.gltf["bufferViews"].append(buffer_view)
+        self.chunks.append(data)
+        # every buffer view starts aligned to four bytes
+        padding = -len(data) % 4
+        if padding:
+            self.chunks.append(bytes(padding))
+        self.bin_length += len(data) + padding
+        return len(self.gltf["bufferViews"]) - 1
+
+    def write(self, file_path:str):
+        gltf = {key: value for key, value in self.gltf.items() if value != []}
+        if "textures" not in gltf:
+            del gltf["samplers"]
+        gltf["buffers"] = [{"byteLength": self.bin_length}]
+        json_chunk = json.dumps(gltf, separators=(",", ":")).encode("utf-8")
+        json_chunk += b" " * (-len(json_chunk) % 4)
+        total_length = 12 + 8 + len(json_chunk) + 8 + self.bin_length
+        with open(file_path, "wb") as glb_file:
+            glb_file.write(self.GLB_MAGIC + struct.pack("<2I", self.GLB_VERSION, total_length))
+            glb_file.write(struct.pack("<I", len(json_chunk)) + self.JSON_CHUNK + json_chunk)
+            glb_file.write(struct.pack("<I", self.bin_length) + self.BIN_CHUNK)
+            for chunk in self.chunks:
+                glb_file.write(chunk)
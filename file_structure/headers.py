@@ -0,0 +1,18 @@
+import struct
+
+# the compressed files of the games start with this magic, then the size of the zlib payload
+# and the size of the inflated container, the other bytes of the header are not known
+BIN_MAGIC = b"\x00\x01\x01WESYS"
+BIN_HEADER_SIZE = 32
+
+
+def bin_header(compressed_size:int, uncompressed_size:int, template:bytes=None):
+    """
+    32 bytes header of a .bin for a payload of the given sizes, with a template header its
+    magic and unknown bytes are kept and only the sizes are replaced
+    """
+    header = bytearray(template[:BIN_HEADER_SIZE]) if template is not None else bytearray(BIN_HEADER_SIZE)
+    if template is None:
+        header[: len(BIN_MAGIC)] = BIN_MAGIC
+    struct.pack_into("<2I", header, len(BIN_MAGIC), compressed_size, uncompressed_size)
+    return header
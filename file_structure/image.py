@@ -1,10 +1,11 @@
-from PIL import Image, ImageTk
 import io
 import zlib
+import numpy as np
 from .utils.common_functions import to_int
 
 class PESImage() :
     PES_IMAGE_SIGNATURE = bytearray([0x94, 0x72, 0x85, 0x29,])
+    HEADER_SIZE = 128
     width = 0
     height = 0
     bpp = 8
@@ -24,9 +25,79 @@ class PESImage() :
         self.pes_palette = pes_image_bytes[pes_palette_start:pes_idat_start]
         self.pes_idat = pes_image_bytes[pes_idat_start:size]
 
+    def from_png(self, png_bytes:bytes):
+        """
+        Build an 8 bits PES image from a png, the colors are quantized to a 256 entries palette
+        by the fast octree quantizer of PIL and the palette is stored swizzled as the games read it
+        """
+        # pillow is only needed here, conversions to png do not load it
+        from PIL import Image
+        image = Image.open(io.BytesIO(png_bytes)).convert("RGBA")
+        quantized = image.quantize(256, method=Image.Quantize.FASTOCTREE)
+        colors = np.frombuffer(bytes(quantized.getpalette("RGBA")), dtype=np.uint8).reshape(-1, 4)[:256]
+        palette = np.zeros((256, 4), dtype=np.uint8)
+        palette[: len(colors)] = colors
+        # inverse of the alpha doubling of the png conversion, the pes alpha goes from 0 to 128
+        palette[:, 3] = (palette[:, 3].astype(np.uint16) + 1) // 2
+        self.width, self.height = image.size
+        self.bpp = 8
+        self.pes_palette = bytearray(palette.tobytes())
+        self.pes_idat = bytearray(np.asarray(quantized, dtype=np.uint8).tobytes())
+        # the swizzle is its own inverse
+        self.bgr_to_bgri()
+
+    def to_bytes(self, template:bytearray=None):
+        """
+        Bytes of the PES image, with a template PES image its header is kept and only the
+        offsets, size and dimensions are updated
+        """
+        if template is not None:
+            header = bytearray(template[: min(to_int(template[16:18]), to_int(template[18:20]))])
+        else:
+            header = bytearray(self.HEADER_SIZE)
+            header[:4] = self.PES_IMAGE_SIGNATURE
+        size = len(header) + len(self.pes_palette) + len(self.pes_idat)
+        header[8:12] = size.to_bytes(4, "little")
+        header[16:18] = (len(header) + len(self.pes_palette)).to_bytes(2, "little")
+        header[18:20] = len(header).to_bytes(2, "little")
+        header[20:22] = self.width.to_bytes(2, "little")
+        header[22:24] = self.height.to_bytes(2, "little")
+        return header + self.pes_palette + self.pes_idat
+
     def __valid_PESImage(self,magic_number : bytearray):
         return magic_number == self.PES_IMAGE_SIGNATURE
 
+    def indexed_pixels(self):
+        """
+        Palette indices as one row per line of the image, a view of pes_idat so nothing is copied
+        """
+        pixels = np.frombuffer(self.pes_idat, dtype=np.uint8)
+        if len(pixels) < self.width * self.height:
+            raise ValueError("PES image has less pixels than its size!")
+        return pixels[: self.width * self.height].reshape(self.height, self.width)
+
+    def palette_rgba(self):
+        """
+        Palette as (r, g, b, a) rows with the alpha doubled as in the png, like the png
+        it expects bgr_to_bgri to have been called already
+        """
+        colors = np.frombuffer(self.pes_palette, dtype=np.uint8)
+        colors = colors[: len(colors) // 4 * 4].reshape(-1, 4).copy()
+        colors[:, 3] = np.minimum(colors[:, 3].astype(np.uint16) * 2, 255)
+        return colors
+
+    def to_rgba(self):
+        """
+        Pixels expanded through the palette into a (height, width, 4) array, the same colors
+        as the png without compressing and decoding it
+        """
+        palette = np.zeros((256, 4), dtype=np.uint8)
+        colors = self.palette_rgba()[:256]
+        palette[: len(colors)] = colors
+        # each color looked up as a single 32 bits value instead of four bytes
+        rgba = palette.view(np.uint32).ravel()[self.indexed_pixels()]
+        return rgba.view(np.uint8).reshape(self.height, self.width, 4)
+
     def bgr_to_bgri(self):
         for i in range(32,len(self.pes_palette),128):
             self.pes_palette[i:i+32], self.pes_palette[i+32:i+72] = self.pes_palette[i+32:i+72], self.pes_palette[i:i+32]
@@ -49,9 +120,10 @@ class PNGImage:
     text_software = 'OF Team Editor'.encode('iso-8859-1')
     separator = bytearray(1)
     
-    def png_from_pes_img(self, pes_img: PESImage):
+    def png_from_pes_img(self, pes_img: PESImage, compression:int=-1):
         """
-        Returns a PNG image from a pes image
+        Returns a PNG image from a pes image, compression is the zlib level of the pixels from
+        0 to 9 where 0 only stores them, -1 is the zlib default
         """
         self.pes_img = pes_img
         IHDR_DATA = (bytearray(self.pes_img.width.to_bytes(4, byteorder='big', signed=False)) 
@@ -67,7 +139,7 @@ class PNGImage:
         trns_lenght = bytearray(len(trns_data).to_bytes(4, byteorder='big', signed=False))
         trns_crc32 = bytearray(zlib.crc32(self.TRNS+trns_data).to_bytes(4, byteorder='big', signed=False))
         trns_chunk = trns_lenght + self.TRNS + trns_data + trns_crc32
-        idat_data = self.__pes_px_to_idat()
+        idat_data = self.__pes_px_to_idat(compression)
         idat_lenght = bytearray(len(idat_data).to_bytes(4, byteorder='big', signed=False))
         idat_crc32 = bytearray(zlib.crc32(self.IDAT + idat_data).to_bytes(4, byteorder='big', signed=False))
         idat_chunk = bytearray(idat_lenght + self.IDAT + idat_data + idat_crc32)
@@ -84,38 +156,39 @@ class PNGImage:
         self.png = self.PNG_SIGNATURE + ihdr_chunk + plt_chunk + trns_chunk + author_chunk + software_chunk + idat_chunk + self.iend_chunk
 
     def __png_bytes_to_tk_img(self):
-        return ImageTk.PhotoImage(Image.open(io.BytesIO(self.png)).convert("RGBA"))
+        # tkinter comes with ImageTk, so it is only imported by the gui
+        from PIL import Image, ImageTk
+        # built from the palette lookup, decoding the png again would undo what was just compressed
+        return ImageTk.PhotoImage(Image.fromarray(self.pes_img.to_rgba(), "RGBA"))
+
+    def __pes_palette_colors(self):
+        """
+        View of the pes palette as one (r, g, b, a) row per color
+        """
+        palette = np.frombuffer(self.pes_img.pes_palette, dtype=np.uint8)
+        return palette[: len(palette) // 4 * 4].reshape(-1, 4)
 
     def __pes_palette_to_RGB(self):
-        palette_data = bytearray()
-        for j in range(0, len(self.pes_img.pes_palette), 4):
-            palette_data += self.pes_img.pes_palette[j : j + 3]
-        return palette_data
+        return bytearray(self.__pes_palette_colors()[:, :3].tobytes())
 
     def __pes_trns_to_alpha(self):
-        trns_data = bytearray()
-        for j in range(3, len(self.pes_img.pes_palette), 4):
-            trns_data += self.pes_img.pes_palette[j : j + 1]
-        print(trns_data)
-        trns_data = self.__disable_alpha(trns_data)
-        print(trns_data)
-        return trns_data
-
-    def __pes_px_to_idat(self):
+        return self.__disable_alpha(self.__pes_palette_colors()[:, 3])
+
+    def __pes_px_to_idat(self, compression:int=-1):
         step = self.pes_img.width
         if step == 32:
             step = int(step / 2)
-        idat_uncompress = bytearray()
-        for j in range(0, len(self.pes_img.pes_idat), step):
-            idat_uncompress += self.separator + self.pes_img.pes_idat[j : j + step]
-        return bytearray(zlib.compress(idat_uncompress))
+        pixels = np.frombuffer(self.pes_img.pes_idat, dtype=np.uint8)
+        rows = len(pixels) // step
+        # every scanline starts with the filter type byte, zero for no filter
+        scanlines = np.zeros((rows, step + 1), dtype=np.uint8)
+        scanlines[:, 1:] = pixels[: rows * step].reshape(rows, step)
+        idat_uncompress = scanlines.tobytes()
+        if len(pixels) % step:
+            idat_uncompress += self.separator + pixels[rows * step :].tobytes()
+        return bytearray(zlib.compress(idat_uncompress, compression))
 
     def __disable_alpha(self,trns_data):
-        for i in range(0,len(trns_data),1): #Solo toma los bytes de transparencia
-            value = trns_data[i]*2
-            if value >= 256: #Si el valor es (mayor o igual a 256) se resta 1 al valor
-                value = value-1
-            elif value <= 0: #Si no el valor es (menor o igual al 0) se queda en 0
-                value = 0
-            trns_data[i] = value
-        return trns_data
+        # the pes alpha goes from 0 to 128, doubling it and keeping it under 256 gives the png alpha
+        alpha = np.minimum(np.asarray(trns_data, dtype=np.uint16) * 2, 255)
+        return bytearray(alpha.astype(np.uint8).tobytes())
@@ -0,0 +1,105 @@
+import numpy as np
+from collections.abc import Sequence
+from .object_3d import PolygonalFace, Vertex, VertexNormal, VertexTexture
+
+
+class Mesh:
+    """
+    Compact geometry of a model, vertex attributes are stored as float32 arrays
+    (N,3) positions and normals, (N,2) uvs and the triangles as an uint32 (M,3)
+    array of zero based indices
+    """
+    __slots__ = ("positions", "normals", "uvs", "faces")
+
+    def __init__(self, positions=None, normals=None, uvs=None, faces=None):
+        self.positions = _as_array(positions, np.float32, 3)
+        self.normals = _as_array(normals, np.float32, 3)
+        self.uvs = _as_array(uvs, np.float32, 2)
+        self.faces = _as_array(faces, np.uint32, 3)
+
+    @classmethod
+    def from_pieces(cls, positions:list, normals:list, uvs:list, faces:list):
+        """
+        Build a mesh from lists of per piece arrays, face indices must already be
+        offset to the whole model
+        """
+        return cls(
+            concatenate_pieces(positions, np.float32, 3),
+            concatenate_pieces(normals, np.float32, 3),
+            concatenate_pieces(uvs, np.float32, 2),
+            concatenate_pieces(faces, np.uint32, 3),
+        )
+
+    @property
+    def vertex_count(self):
+        return len(self.positions)
+
+    @property
+    def face_count(self):
+        return len(self.faces)
+
+    @property
+    def has_normals(self):
+        return len(self.normals) > 0 and len(self.normals) == len(self.positions)
+
+    @property
+    def nbytes(self):
+        return self.positions.nbytes + self.normals.nbytes + self.uvs.nbytes + self.faces.nbytes
+
+
+class MeshListView(Sequence):
+    """
+    Read only list like view over one of the mesh arrays, it builds the old
+    Vertex/VertexNormal/VertexTexture/PolygonalFace objects only when an item is requested
+    """
+    __slots__ = ("_array", "_factory", "_offset")
+
+    def __init__(self, array:np.ndarray, factory, offset=0):
+        self._array = array
+        self._factory = factory
+        self._offset = offset
+
+    def __len__(self):
+        return len(self._array)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._build(row) for row in self._array[i].tolist()]
+        return self._build(self._array[i].tolist())
+
+    def __iter__(self):
+        for row in self._array.tolist():
+            yield self._build(row)
+
+    def _build(self, row):
+        if self._offset:
+            return self._factory(*[value + self._offset for value in row])
+        return self._factory(*row)
+
+
+def vertex_view(mesh:Mesh):
+    return MeshListView(mesh.positions, Vertex)
+
+def vertex_normal_view(mesh:Mesh):
+    return MeshListView(mesh.normals, VertexNormal)
+
+def vertex_texture_view(mesh:Mesh):
+    return MeshListView(mesh.uvs, VertexTexture)
+
+def polygonal_face_view(mesh:Mesh):
+    # the old face objects use one based indices as in the obj format
+    return MeshListView(mesh.faces, PolygonalFace, 1)
+
+def _as_array(data, dtype, width):
+    if data is None:
+        return np.empty((0, width), dtype=dtype)
+    return np.ascontiguousarray(data, dtype=dtype).reshape(-1, width)
+
+def concatenate_pieces(arrays:list, dtype, width):
+    """
+    Join the per piece arrays of an attribute into one (N,width) array
+    """
+    arrays = [_as_array(array, dtype, width) for array in arrays]
+    if not arrays:
+        return np.empty((0, width), dtype=dtype)
+    return np.concatenate(arrays)
@@ -0,0 +1,144 @@
+import numpy as np
+from .mesh import Mesh
+
+
+def optimize_mesh(mesh:Mesh, tolerance:float=1e-5, normal_tolerance:float=1e-3, cache_size:int=16):
+    """
+    Weld the duplicated vertices of a mesh, drop the degenerate triangles and the vertices no
+    triangle uses, then order triangles and vertices for the vertex cache of the gpu
+    """
+    mesh = weld_vertices(mesh, tolerance, normal_tolerance)
+    mesh = remove_degenerate_faces(mesh)
+    faces = reorder_for_vertex_cache(mesh.faces, mesh.vertex_count, cache_size)
+    return remove_unreferenced_vertices(Mesh(mesh.positions, mesh.normals, mesh.uvs, faces))
+
+def weld_vertices(mesh:Mesh, tolerance:float=1e-5, normal_tolerance:float=1e-3):
+    """
+    Merge the vertices whose position and uv are equal within tolerance and whose normals are
+    equal within normal_tolerance, as the ones repeated on the seams between PS2 and PSP pieces.
+    The attributes are snapped to a grid and the snapped rows are the keys of the weld
+    """
+    columns = [np.round(mesh.positions / tolerance)]
+    if len(mesh.uvs) == mesh.vertex_count:
+        columns.append(np.round(mesh.uvs / tolerance))
+    if mesh.has_normals:
+        columns.append(np.round(mesh.normals / normal_tolerance))
+    keys = np.ascontiguousarray(np.concatenate(columns, axis=1).astype(np.int64))
+    # each row seen as a single opaque value so rows are compared in one pass
+    rows = keys.view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+    _, first, remap = np.unique(rows, return_index=True, return_inverse=True)
+    # keep the welded vertices in the order they first appeared
+    order = np.argsort(first)
+    new_index = np.empty(len(order), dtype=np.int64)
+    new_index[order] = np.arange(len(order))
+    kept = first[order]
+    return Mesh(
+        mesh.positions[kept],
+        mesh.normals[kept] if mesh.has_normals else None,
+        mesh.uvs[kept] if len(mesh.uvs) == mesh.vertex_count else None,
+        new_index[np.ravel(remap)][mesh.faces.astype(np.int64)],
+    )
+
+def remove_degenerate_faces(mesh:Mesh):
+    """
+    Drop the triangles that use a vertex more than once
+    """
+    faces = mesh.faces
+    keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+    return Mesh(mesh.positions, mesh.normals, mesh.uvs, faces[keep])
+
+def remove_unreferenced_vertices(mesh:Mesh):
+    """
+    Drop the vertices no triangle uses and number the others in the order the triangles use them
+    """
+    flat_faces = mesh.faces.astype(np.int64).ravel()
+    used, first = np.unique(flat_faces, return_index=True)
+    kept = used[np.argsort(first)]
+    new_index = np.full(mesh.vertex_count, -1, dtype=np.int64)
+    new_index[kept] = np.arange(len(kept))
+    return Mesh(
+        mesh.positions[kept],
+        mesh.normals[kept] if mesh.has_normals else None,
+        mesh.uvs[kept] if len(mesh.uvs) == mesh.vertex_count else None,
+        new_index[flat_faces].reshape(-1, 3),
+    )
+
+def reorder_for_vertex_cache(faces:np.ndarray, vertex_count:int, cache_size:int=16):
+    """
+    Order the triangles with the Tipsify algorithm (Sander, Nehab and Barczak 2007), it fans
+    around the vertex most likely to still be in a cache of cache_size entries
+    """
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    if not len(faces):
+        return faces
+    flat_faces = faces.ravel()
+    # triangles of each vertex as a compressed adjacency list
+    vertex_triangles = (np.argsort(flat_faces, kind="stable") // 3).tolist()
+    adjacency_end = np.cumsum(np.bincount(flat_faces, minlength=vertex_count)).tolist()
+    adjacency_start = [0] + adjacency_end[:-1]
+    live = np.bincount(flat_faces, minlength=vertex_count).tolist()
+    triangles = faces.tolist()
+    cache_time = [0] * vertex_count
+    emitted = [False] * len(triangles)
+    dead_end = []
+    order = []
+    timestamp = cache_size + 1
+    cursor = 0
+    fanning = 0
+    while fanning >= 0:
+        candidates = []
+        for t in vertex_triangles[adjacency_start[fanning] : adjacency_end[fanning]]:
+            if emitted[t]:
+                continue
+            emitted[t] = True
+            order.append(t)
+            for v in triangles[t]:
+                dead_end.append(v)
+                candidates.append(v)
+                live[v] -= 1
+                if timestamp - cache_time[v] > cache_size:
+                    cache_time[v] = timestamp
+                    timestamp += 1
+        # next fanning vertex, the candidate that will still be cached after its fan
+        fanning = -1
+        priority = -1
+        for v in candidates:
+            if live[v] > 0:
+                age = timestamp - cache_time[v]
+                candidate_priority = age if age + 2 * live[v] <= cache_size else 0
+                if candidate_priority > priority:
+                    priority = candidate_priority
+                    fanning = v
+        if fanning < 0:
+            while dead_end:
+                v = dead_end.pop()
+                if live[v] > 0:
+                    fanning = v
+                    break
+        if fanning < 0:
+            while cursor < vertex_count:
+                if live[cursor] > 0:
+                    fanning = cursor
+                    break
+                cursor += 1
+    return faces[order]
+
+def average_cache_miss_ratio(faces:np.ndarray, cache_size:int=16):
+    """
+    Vertices transformed per triangle with a fifo cache of cache_size entries, from 0.5 at best to 3
+    """
+    faces = np.asarray(faces, dtype=np.int64)
+    if not len(faces):
+        return 0.0
+    cache = []
+    cached = set()
+    misses = 0
+    for v in faces.ravel().tolist():
+        if v in cached:
+            continue
+        misses += 1
+        cache.append(v)
+        cached.add(v)
+        if len(cache) > cache_size:
+            cached.discard(cache.pop(0))
+    return misses / len(faces)
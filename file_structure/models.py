@@ -1,32 +1,136 @@
-import struct
-from .object_3d import PolygonalFace, Vertex, VertexNormal, VertexTexture
-from .utils.common_functions import to_float, to_int
+import numpy as np
+from collections import namedtuple
+from functools import cached_property
+from .mesh import Mesh, concatenate_pieces, polygonal_face_view, vertex_normal_view, vertex_texture_view, vertex_view
+from .strips import count_strip_triangles, strip_to_triangles, triangles_to_strip
+from .utils.common_functions import to_int
+
+PS2PieceLayout = namedtuple(
+    "PS2PieceLayout",
+    "vertex_in_piece vertex_start_address normals_in_piece normals_start_address uv_in_piece uv_start_address tri_counter",
+)
+PSPPieceLayout = namedtuple(
+    "PSPPieceLayout",
+    "vertex_in_piece uv_start_address tri_start_address tri_list_size tri_counter",
+)
+
+class FaceModel:
+    """
+    Common base of the face/hair models. Building a model only parses its headers and pieces table,
+    positions, normals, uvs and faces are decoded the first time they are used and kept after that.
+    The old list attributes are kept as views over the arrays of self.mesh
+    """
+    # whether a strip triangle whose last two indices match is dropped
+    strict_strips = True
+
+    @cached_property
+    def mesh(self):
+        return Mesh(self.positions, self.normals, self.uvs, self.faces)
+
+    def bounds(self):
+        """
+        (min, max) corners of the model, only the positions are decoded
+        """
+        if not len(self.positions):
+            return np.zeros(3, dtype=np.float32), np.zeros(3, dtype=np.float32)
+        return self.positions.min(axis=0), self.positions.max(axis=0)
+
+    def summary(self):
+        """
+        Counts of the model, the faces come from the strip indices and no vertex is decoded
+        """
+        return {
+            "vertices": self.vertex_count,
+            "faces": self.face_count(),
+            "pieces": self.pieces_total,
+        }
+
+    def face_count(self):
+        """
+        Triangles of the model counted from the degenerate mask of its strips, the triangles
+        are neither built nor kept unless they were already decoded
+        """
+        if "faces" in self.__dict__:
+            return len(self.faces)
+        return sum(count_strip_triangles(strip, self.strict_strips) for strip in self.strips())
 
-class FacePCModel:
+    @property
+    def vertex_list(self):
+        return vertex_view(self.mesh)
+
+    @property
+    def vertex_normal_list(self):
+        return vertex_normal_view(self.mesh)
+
+    @property
+    def vertex_texture_list(self):
+        return vertex_texture_view(self.mesh)
+
+    @property
+    def polygonal_faces_list(self):
+        return polygonal_face_view(self.mesh)
+
+class FacePCModel(FaceModel):
     magic_number = bytearray([0x20,0x05,0x04,0x20])
     data_size = 32
+    vertex_dtype = np.dtype([
+        ("position", "<f4", (3,)),
+        ("normal", "<f4", (3,)),
+        ("uv", "<f4", (2,)),
+    ])
 
     def __init__(self,model_bytes):
         self.model_bytes = model_bytes
         self.validate()
         self.parts_counter_address = to_int(self.model_bytes[16:20])
+        self.pieces_total = to_int(self.model_bytes[self.parts_counter_address : self.parts_counter_address + 4])
         self.vertex_count_address = to_int(self.model_bytes[16:20]) + 8
         self.vertex_count = to_int(self.model_bytes[self.vertex_count_address : self.vertex_count_address + 2])
         self.vertex_start_address = self.vertex_count_address + 8
         self.vertex_normal_start_address = self.vertex_start_address + 12
         self.vextex_texture_start_address = self.vertex_start_address + 24
-        self.load_vertex()
-        self.load_vertex_normal()
-        self.load_vextex_texture()
         self.poly_faces_address = to_int(self.model_bytes[20:24])
         self.poly_faces_count = to_int(self.model_bytes[self.poly_faces_address : self.poly_faces_address + 2])
         self.poly_faces_start_address = self.poly_faces_address + 2
-        self.load_polygonal_faces()
 
     @property
     def parts_offset_table_address(self):
         return self.parts_counter_address + 4
 
+    @classmethod
+    def from_mesh(cls, mesh:Mesh, template:bytes=None):
+        """
+        Build a PC model from a mesh, the inverse of the decoding. The triangles are stripified
+        and the normals are computed when the mesh has none. With a template model its header and
+        parts header are kept, without one a minimal header is written
+        """
+        if mesh.vertex_count > 0xFFFF:
+            raise ValueError(f"A PC model can not have more than 65535 vertices, this one has {mesh.vertex_count}!")
+        strip = triangles_to_strip(mesh.faces)
+        if len(strip) > 0xFFFF:
+            raise ValueError(f"The triangle strip of the model is too long ({len(strip)} indices)!")
+        normals = mesh.normals if mesh.has_normals else vertex_normals(mesh)
+        records = np.zeros(mesh.vertex_count, dtype=cls.vertex_dtype)
+        records["position"] = ((mesh.positions + [0, 0.751679, 0]) / (np.array([0.025, -0.025, 0.025]) * 1.25029))[:, ::-1]
+        records["normal"] = (normals / np.array([0.025, -0.025, 0.025]))[:, ::-1]
+        records["uv"][:, 0] = mesh.uvs[:, 0] if len(mesh.uvs) else 0
+        records["uv"][:, 1] = 1 - mesh.uvs[:, 1] if len(mesh.uvs) else 0
+        if template is not None:
+            parts_counter_address = to_int(template[16:20])
+            header = bytearray(template[: parts_counter_address + 16])
+        else:
+            parts_counter_address = 32
+            header = bytearray(parts_counter_address + 16)
+            header[:4] = cls.magic_number
+            header[16:20] = parts_counter_address.to_bytes(4, "little")
+            # the vertices are written as a single part
+            header[parts_counter_address : parts_counter_address + 4] = (1).to_bytes(4, "little")
+        header[parts_counter_address + 8 : parts_counter_address + 10] = mesh.vertex_count.to_bytes(2, "little")
+        poly_faces_address = len(header) + records.nbytes
+        header[20:24] = poly_faces_address.to_bytes(4, "little")
+        model_bytes = header + records.tobytes() + len(strip).to_bytes(2, "little") + strip.astype("<u2").tobytes()
+        return cls(model_bytes)
+
     def validate(self):
         """
         Function to check if we have a proper PES PC Model
@@ -35,81 +139,69 @@ class FacePCModel:
             raise ValueError("Not a PC face model!")
         return True
 
-    def load_vertex(self):
-        """
-        Load all vertex into a list
-        """
-        self.vertex_list = []
-        for i in range(self.vertex_count):
-            pos = self.vertex_start_address + (self.data_size * i)
-            vertex = Vertex(
-            (to_float(self.model_bytes[pos + 8 : pos + 12]) * 0.025) * 1.25029,
-            ((to_float(self.model_bytes[pos + 4 : pos + 8]) * -0.025) * 1.25029) - 0.751679,
-            (to_float(self.model_bytes[pos : pos + 4]) * 0.025) * 1.25029,
-            )
-            self.vertex_list.append(vertex)
-
-    def load_vertex_normal(self):
-        """
-        Load all vertex normals into a list
-        """
-        self.vertex_normal_list = []
-        for i in range(self.vertex_count):
-            pos = self.vertex_normal_start_address + (self.data_size * i)
-            vertex_normal = VertexNormal(
-            to_float(self.model_bytes[pos + 8 : pos + 12]) * 0.025,
-            to_float(self.model_bytes[pos + 4 : pos + 8]) * -0.025,
-            to_float(self.model_bytes[pos : pos + 4]) * 0.025,
-            )
-            self.vertex_normal_list.append(vertex_normal)
-
-    def load_vextex_texture(self):
-        """
-        Load all vertex texture (uv map coordinates) into a list
-        """
-        self.vertex_texture_list = []
-        for i in range(self.vertex_count):
-            pos = self.vextex_texture_start_address + (self.data_size * i)
-            vertex_texture = VertexTexture(
-            to_float(self.model_bytes[pos : pos + 4]),
-            (1 - to_float(self.model_bytes[pos + 4 : pos + 8])),
-            )
-            self.vertex_texture_list.append(vertex_texture)
-    
+    @cached_property
+    def vertex_records(self):
+        """
+        Structured view over the whole vertex block
+        """
+        return np.frombuffer(
+            self.model_bytes,
+            dtype=self.vertex_dtype,
+            count=self.vertex_count,
+            offset=self.vertex_start_address,
+        )
+
+    @cached_property
+    def positions(self):
+        # the model stores the axis as z, y, x so we flip them while converting
+        positions = self.vertex_records["position"][:, ::-1] * np.array([0.025, -0.025, 0.025]) * 1.25029
+        positions[:, 1] -= 0.751679
+        return positions.astype(np.float32)
+
+    @cached_property
+    def normals(self):
+        return (self.vertex_records["normal"][:, ::-1] * np.array([0.025, -0.025, 0.025])).astype(np.float32)
+
+    @cached_property
+    def uvs(self):
+        uvs = self.vertex_records["uv"].astype(np.float64)
+        uvs[:, 1] = 1 - uvs[:, 1]
+        return uvs.astype(np.float32)
+
+    @cached_property
+    def faces(self):
+        return self.load_polygonal_faces()
+
+    def strips(self):
+        yield self.load_strip()
+
+    def load_vertex_data(self):
+        """
+        Load all vertex, vertex normals and vertex texture (uv map coordinates) as arrays,
+        the whole vertex block is decoded through a structured view of the records
+        """
+        return self.positions, self.normals, self.uvs
+
     def load_polygonal_faces(self):
         """
-        Load all polygonal faces into a list
-        """
-        self.polygonal_faces_list = []
-        tstrip_index_list = []
-        for i in range(self.poly_faces_count):
-            idx=to_int(self.model_bytes[
-                    self.poly_faces_start_address + i * 2 : self.poly_faces_start_address + i * 2 + 2
-                    ]) + 1
-            tstrip_index_list.append(idx)
-
-        for i in range(self.poly_faces_count - 2):
-            if (tstrip_index_list[i] != tstrip_index_list[i + 1]) and (tstrip_index_list[i + 1] != tstrip_index_list[i + 2]) and (tstrip_index_list[i + 2] != tstrip_index_list[i]):
-                if i & 1:
-                    self.polygonal_faces_list.append(
-                        PolygonalFace(
-                            tstrip_index_list[i + 1],
-                            tstrip_index_list[i],
-                            tstrip_index_list[i + 2]
-                        )
-                    )
-                else:
-                    self.polygonal_faces_list.append(
-                        PolygonalFace(
-                            tstrip_index_list[i],
-                            tstrip_index_list[i + 1],
-                            tstrip_index_list[i + 2]
-                        )
-                    )
-                i+=3
-
-class FacePS2Model:
+        Load all polygonal faces into a (M,3) array of zero based indices
+        """
+        return strip_to_triangles(self.load_strip(), self.strict_strips)
+
+    def load_strip(self):
+        return np.frombuffer(
+            self.model_bytes,
+            dtype="<u2",
+            count=self.poly_faces_count,
+            offset=self.poly_faces_start_address,
+        )
+
+class FacePS2Model(FaceModel):
     magic_number = bytearray([0x03,0x00,0xFF,0xFF])
+    factor = 0.001953
+    factor_uv = 0.000244
+    vertex_scale = np.array([factor, -factor, factor])
+    uv_scale = np.array([factor_uv, -factor_uv])
 
     def __init__(self,model_bytes:bytes):
         self.model_bytes = model_bytes
@@ -117,12 +209,8 @@ class FacePS2Model:
         self.pieces_total = to_int(self.model_bytes[32 : 36])
         self.pieces_start_address = to_int(self.model_bytes[36 : 40])
         self.pieces_end_address =  to_int(self.model_bytes[44 : 48])
-        self.vertex_list = []
-        self.vertex_normal_list = []
-        self.vertex_texture_list = []
-        self.polygonal_faces_list = []
         self.set_pieces()
-        self.read_pieces()
+        self.set_pieces_layout()
 
     def validate(self):
         """
@@ -147,9 +235,13 @@ class FacePS2Model:
             sum_address += piece_size
             i +=1
 
-    def read_pieces(self):
+    def set_pieces_layout(self):
+        """
+        Read the counters of every piece and where each of its blocks starts
+        """
         vertex_size = 6 # 3 int16
         tri_counter = 0
+        self.pieces_layout = []
         for piece in self.pieces:
             sum1 = 2
             sum2 = 4
@@ -169,102 +261,98 @@ class FacePS2Model:
             uv_in_piece = piece[normals_in_piece * vertex_size + normals_start_address + sum1]
             #print("uv ", uv_in_piece)
             uv_start_address = normals_in_piece * vertex_size + normals_start_address + sum2
-            # Load vertex
-            self.load_vertex(piece, vertex_in_piece, vertex_start_address)
-            # Load Normals
-            self.load_vertex_normal(piece, normals_in_piece, normals_start_address)
-            # Load UV
-            self.load_vextex_texture(piece, uv_in_piece, uv_start_address)
-            # Load triangles
-            self.load_polygonal_faces(piece, tri_counter)
+            self.pieces_layout.append(PS2PieceLayout(
+                vertex_in_piece, vertex_start_address, normals_in_piece, normals_start_address,
+                uv_in_piece, uv_start_address, tri_counter,
+            ))
             tri_counter+=vertex_in_piece
+        self.vertex_count = tri_counter
+
+    @cached_property
+    def positions(self):
+        return concatenate_pieces([
+            self.load_vertex(piece, layout.vertex_in_piece, layout.vertex_start_address)
+            for piece, layout in zip(self.pieces, self.pieces_layout)
+        ], np.float32, 3)
+
+    @cached_property
+    def normals(self):
+        return concatenate_pieces([
+            self.load_vertex_normal(piece, layout.normals_in_piece, layout.normals_start_address)
+            for piece, layout in zip(self.pieces, self.pieces_layout)
+        ], np.float32, 3)
+
+    @cached_property
+    def uvs(self):
+        return concatenate_pieces([
+            self.load_vextex_texture(piece, layout.uv_in_piece, layout.uv_start_address)
+            for piece, layout in zip(self.pieces, self.pieces_layout)
+        ], np.float32, 2)
+
+    @cached_property
+    def faces(self):
+        return concatenate_pieces([
+            self.load_polygonal_faces(piece, layout.tri_counter)
+            for piece, layout in zip(self.pieces, self.pieces_layout)
+        ], np.uint32, 3)
+
+    def strips(self):
+        for piece, layout in zip(self.pieces, self.pieces_layout):
+            yield self.load_strip(piece, layout.tri_counter)
 
     def load_vertex(self, piece, vertex_in_piece, vertex_start_address):
-        vertex_size = 6 # 3 int16
-        factor = 0.001953
-        # Load vertex
-        for j in range(vertex_in_piece):
-            pos = vertex_start_address + j * vertex_size
-            x,y,z = struct.unpack('<3h', piece[pos : pos + vertex_size])
-            #print("vertex #", j)
-            #print(x * factor, y * factor, z * factor)
-            self.vertex_list.append(
-                Vertex(
-                    x * factor, 
-                    y * factor *-1, 
-                    z * factor,
-                )
-            )
+        """
+        Load all vertex of a piece into a (N,3) array
+        """
+        return self.load_int16_block(piece, vertex_in_piece, vertex_start_address, 3, self.vertex_scale)
 
     def load_vertex_normal(self, piece, normals_in_piece, normals_start_address):
         """
-        Load all vertex normals into a list
+        Load all vertex normals of a piece into a (N,3) array
         """
-        vertex_size = 6 # 3 int16
-        factor = 0.001953
-        for j in range(normals_in_piece):
-            pos = normals_start_address + j * vertex_size
-            x,y,z = struct.unpack('<3h', piece[pos : pos + vertex_size])
-            #print("vertex normals #", j)
-            #print(x * factor, y * factor, z * factor)
-            self.vertex_normal_list.append(
-                VertexNormal(
-                    x * factor, 
-                    y * factor *-1, 
-                    z * factor,
-                )
-            )
+        return self.load_int16_block(piece, normals_in_piece, normals_start_address, 3, self.vertex_scale)
 
     def load_vextex_texture(self, piece, uv_in_piece, uv_start_address):
         """
-        Load all vertex texture (uv map coordinates) into a list
-        """
-        uv_size = 4 # 3 int16
-        factor_uv = 0.000244
-        for j in range(uv_in_piece):
-            pos = uv_start_address + j * uv_size
-            u, v = struct.unpack('<2h', piece[pos : pos + uv_size])
-            #print("vertex texture #", j)
-            #print(u * factor_uv, v * factor_uv,)
-            self.vertex_texture_list.append(
-                VertexTexture(
-                    u * factor_uv, 
-                    1 - v * factor_uv, 
-                )
-            )
+        Load all vertex texture (uv map coordinates) of a piece into a (N,2) array
+        """
+        uvs = self.load_int16_block(piece, uv_in_piece, uv_start_address, 2, self.uv_scale)
+        uvs[:, 1] += 1
+        return uvs
+
+    def load_int16_block(self, piece, count, start_address, width, scale):
+        """
+        Decode a block of int16 rows with a single view over the piece and scale it in place
+        """
+        block = np.frombuffer(piece, dtype="<i2", count=count * width, offset=start_address).reshape(count, width).astype(np.float64)
+        block *= scale
+        return block
 
     def load_polygonal_faces(self, piece: bytearray, tri_counter:int):
         """
-        Load all polygonal faces into a list
+        Load all polygonal faces of a piece into a (M,3) array of zero based indices
         """
+        return strip_to_triangles(self.load_strip(piece, tri_counter), self.strict_strips)
+
+    def load_strip(self, piece: bytearray, tri_counter:int):
         tri_idx = bytearray([0x01, 0x00, 0x00, 0x05, 0x01, 0x01, 0x00, 0x01])
         tri_start_address = piece.find(tri_idx) + len(tri_idx)
         tri_size = piece[tri_start_address + 2] * 0x8
-        tri_data = piece[tri_start_address + 4 : tri_start_address + 4 + tri_size]
-        tstrip_index_list = [int((x - 32768)/4) + tri_counter if x >= 32768 else int((x)/4) + tri_counter for x in struct.unpack(f'<{int(len(tri_data)/2)}H', tri_data)]
-        for k in range(len(tstrip_index_list)-2):
-            if (tstrip_index_list[k] != tstrip_index_list[k + 1]) and (tstrip_index_list[k + 1] != tstrip_index_list[k + 2]) and (tstrip_index_list[k + 2] != tstrip_index_list[k]):
-                if k & 1:
-                    self.polygonal_faces_list.append(
-                        PolygonalFace(
-                            tstrip_index_list[k + 1],
-                            tstrip_index_list[k],
-                            tstrip_index_list[k + 2]
-                        )
-                    )
-                else:
-                    self.polygonal_faces_list.append(
-                        PolygonalFace(
-                            tstrip_index_list[k],
-                            tstrip_index_list[k + 1],
-                            tstrip_index_list[k + 2]
-                        )
-                    )
-                k+=3
-
-class FacePSPModel:
+        tri_data = np.frombuffer(piece, dtype="<u2", count=tri_size // 2, offset=tri_start_address + 4)
+        # the high bit only flags the strip restarts, the index is stored four times bigger and one based
+        return ((tri_data & 0x7FFF) >> 2).astype(np.int64) + (tri_counter - 1)
+
+class FacePSPModel(FaceModel):
     magic_number = bytearray([0x03,0x00,0xFF,0xFF])
-    data_size = 14 # 3 int16
+    # the PSP strips only drop the triangles that repeat their first index
+    strict_strips = False
+    data_size = 14 # 2 int16 uv, 2 int16 normal, 3 int16 position
+    # interleaved records as the PSP GE reads them, the normal is kept as its two raw int16
+    vertex_dtype = np.dtype([
+        ("uv", "<i2", (2,)),
+        ("normal", "<i2", (2,)),
+        ("position", "<i2", (3,)),
+    ])
 
     def __init__(self,model_bytes:bytes):
         self.model_bytes = model_bytes
@@ -273,12 +361,8 @@ class FacePSPModel:
         #print("total of parts here is: ", self.pieces_total)
         self.pieces_start_address = to_int(self.model_bytes[36 : 40])
         self.pieces_end_address =  to_int(self.model_bytes[44 : 48])
-        self.vertex_list = []
-        self.vertex_normal_list = []
-        self.vertex_texture_list = []
-        self.polygonal_faces_list = []
         self.set_pieces()
-        self.read_pieces()
+        self.set_pieces_layout()
 
     def validate(self):
         """
@@ -303,91 +387,110 @@ class FacePSPModel:
             sum_address += piece_size
             i +=1
 
-    def read_pieces(self):
-        tri_counter = 1
+    def set_pieces_layout(self):
+        """
+        Read the counters of every piece and where its records and strip start
+        """
+        tri_counter = 0
+        self.pieces_layout = []
         for i, piece in enumerate(self.pieces):
             #print("part #", i)
             vertex_in_piece = to_int(piece[92:94])
-            vertex_start_address = to_int(piece[8:12]) + 8
-            #print("vertex in this part: ",vertex_in_piece, " vertex start address: ", vertex_start_address)
-            normals_start_address =  to_int(piece[8:12]) + 4
             uv_start_address = to_int(piece[8:12])
             tri_start_address = to_int(piece[12:16])
             tri_list_size = to_int(piece[16:20])
             
             #print("tri start address: ", tri_start_address, " tri list size: ", tri_list_size)
             
-            self.load_vertex(piece, vertex_in_piece, vertex_start_address)
-            # Load Normals !!!! NOT IMPLEMENTED YET NORMALS MUST BE X Y Z BUT IN PSP ARE JUST TWO INT16 VALUES
-            #self.load_vertex_normal(piece, vertex_in_piece, normals_start_address)
-            # Load UV
-            self.load_vextex_texture(piece, vertex_in_piece, uv_start_address)
-            # Load triangles in psp there are some parts that dont have triangles, we need to figure it out what to do with it
-            if tri_start_address !=0:
-                self.load_polygonal_faces(piece, tri_start_address, tri_list_size, tri_counter)
+            self.pieces_layout.append(PSPPieceLayout(vertex_in_piece, uv_start_address, tri_start_address, tri_list_size, tri_counter))
             tri_counter+=vertex_in_piece
-            #if i==2:
-                #raise NotImplementedError()
+        self.vertex_count = tri_counter
 
-    def load_vertex(self, piece, vertex_in_piece, vertex_start_address):
-        for i in range(vertex_in_piece):
-            pos = vertex_start_address + (self.data_size * i)
-            z,y,x = struct.unpack('<3h', piece[pos : pos + 6])
-            #print(x,y,z)
-            vertex = Vertex(
-                x * 0.001953,
-                y * -0.001953 - 0.749928,
-                z * 0.001953,
-            )
-            self.vertex_list.append(vertex)
+    def pieces_records(self):
+        """
+        Structured view over the vertex records of each piece
+        """
+        return [
+            self.load_vertex_records(piece, layout.vertex_in_piece, layout.uv_start_address)
+            for piece, layout in zip(self.pieces, self.pieces_layout)
+        ]
+
+    @cached_property
+    def positions(self):
+        return concatenate_pieces([self.load_vertex(records) for records in self.pieces_records()], np.float32, 3)
+
+    @cached_property
+    def normals(self):
+        # left empty until the two int16 encoding is checked against real models, the exports skip them
+        return np.empty((0, 3), dtype=np.float32)
+
+    @cached_property
+    def uvs(self):
+        return concatenate_pieces([self.load_vextex_texture(records) for records in self.pieces_records()], np.float32, 2)
+
+    @cached_property
+    def faces(self):
+        # Load triangles in psp there are some parts that dont have triangles, we need to figure it out what to do with it
+        return concatenate_pieces([
+            self.load_polygonal_faces(piece, layout.tri_start_address, layout.tri_list_size, layout.tri_counter)
+            for piece, layout in zip(self.pieces, self.pieces_layout)
+            if layout.tri_start_address != 0
+        ], np.uint32, 3)
+
+    def strips(self):
+        for piece, layout in zip(self.pieces, self.pieces_layout):
+            if layout.tri_start_address != 0:
+                yield self.load_strip(piece, layout.tri_start_address, layout.tri_list_size, layout.tri_counter)
+
+    def load_vertex_records(self, piece, vertex_in_piece, uv_start_address):
+        """
+        Structured view over the interleaved vertex records of a piece
+        """
+        return np.frombuffer(piece, dtype=self.vertex_dtype, count=vertex_in_piece, offset=uv_start_address)
 
-    def load_vertex_normal(self, piece, normals_in_piece, normals_start_address):
+    def load_vertex(self, records):
+        """
+        Load all vertex of a piece into a (N,3) array
+        """
+        # stored as z, y, x
+        vertex = records["position"][:, ::-1].astype(np.float64)
+        vertex *= [0.001953, -0.001953, 0.001953]
+        vertex[:, 1] -= 0.749928
+        return vertex
+
+    def load_vertex_normal(self, records):
         """
-        Load all vertex normals into a list
+        Load all vertex normals of a piece into a (N,3) array.
+        NOT IMPLEMENTED YET, NORMALS MUST BE X Y Z BUT IN PSP ARE JUST TWO INT16 VALUES,
+        their raw values are in records["normal"]
         """
         raise NotImplementedError()
 
-    def load_vextex_texture(self, piece, uv_in_piece, uv_start_address):
+    def load_vextex_texture(self, records):
         """
-        Load all vertex texture (uv map coordinates) into a list
+        Load all vertex texture (uv map coordinates) of a piece into a (N,2) array
         """
-        for i in range(uv_in_piece):
-            pos = uv_start_address + (self.data_size * i)
-            u, v = struct.unpack('<2h', piece[pos : pos + 4])
-            self.vertex_texture_list.append(
-                VertexTexture(
-                    (u + 32768) * 0.000244,
-                    1 - (v + 32768) * 0.000244,
-                )
-            )
+        vertex_texture = (records["uv"] + 32768.0) * 0.000244
+        vertex_texture[:, 1] = 1 - vertex_texture[:, 1]
+        return vertex_texture
 
     def load_polygonal_faces(self, piece, tri_start_address, tri_size, tri_counter):
         """
-        Load all polygonal faces into a list
+        Load all polygonal faces of a piece into a (M,3) array of zero based indices
         """
-        tstrip_index_list = [x + tri_counter for x in struct.unpack(f'<{tri_size}H', piece[tri_start_address : tri_start_address + tri_size * 2])]
-        for k in range(len(tstrip_index_list)-2):
-            if (tstrip_index_list[k] != tstrip_index_list[k + 1]) and (tstrip_index_list[k + 2] != tstrip_index_list[k]):
-                if k & 1:
-                    self.polygonal_faces_list.append(
-                        PolygonalFace(
-                            tstrip_index_list[k + 1],
-                            tstrip_index_list[k],
-                            tstrip_index_list[k + 2]
-                        )
-                    )
-                else:
-                    self.polygonal_faces_list.append(
-                        PolygonalFace(
-                            tstrip_index_list[k],
-                            tstrip_index_list[k + 1],
-                            tstrip_index_list[k + 2]
-                        )
-                    )
-                k+=3
-
-
-
-
-
-
+        return strip_to_triangles(self.load_strip(piece, tri_start_address, tri_size, tri_counter), self.strict_strips)
+
+    def load_strip(self, piece, tri_start_address, tri_size, tri_counter):
+        return np.frombuffer(piece, dtype="<u2", count=tri_size, offset=tri_start_address).astype(np.int64) + tri_counter
+
+def vertex_normals(mesh:Mesh):
+    """
+    Area weighted vertex normals of a mesh
+    """
+    triangles = mesh.positions.astype(np.float64)[mesh.faces.astype(np.int64)]
+    face_normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    normals = np.zeros((mesh.vertex_count, 3))
+    for corner in range(3):
+        np.add.at(normals, mesh.faces[:, corner].astype(np.int64), face_normals)
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
@@ -0,0 +1,76 @@
+import numpy as np
+from .mesh import Mesh
+
+
+class OBJReader:
+    """
+    Wavefront OBJ reader, every object of the file goes into a single mesh. OBJ indexes
+    positions, uvs and normals separately so each distinct v/vt/vn corner becomes one vertex,
+    polygons are split as triangle fans
+    """
+
+    def __init__(self, file_path:str):
+        self.file_path = file_path
+
+    def read(self):
+        positions, uvs, normals, corners, polygon_sizes = [], [], [], [], []
+        with open(self.file_path, "r", encoding="utf-8", errors="replace") as obj_file:
+            for line in obj_file:
+                values = line.split()
+                if not values:
+                    continue
+                if values[0] == "v":
+                    positions.append(values[1:4])
+                elif values[0] == "vt":
+                    uvs.append(values[1:3])
+                elif values[0] == "vn":
+                    normals.append(values[1:4])
+                elif values[0] == "f":
+                    polygon = [self.parse_corner(corner, len(positions), len(uvs), len(normals)) for corner in values[1:]]
+                    corners.extend(polygon)
+                    polygon_sizes.append(len(polygon))
+        positions = np.array(positions, dtype=np.float64).reshape(-1, 3)
+        uvs = np.array(uvs, dtype=np.float64).reshape(-1, 2)
+        normals = np.array(normals, dtype=np.float64).reshape(-1, 3)
+        corners = np.array(corners, dtype=np.int64).reshape(-1, 3)
+        # one vertex for each distinct corner, the faces index them
+        unique_corners, corner_vertex = np.unique(corners, axis=0, return_inverse=True)
+        faces = self.triangulate(np.ravel(corner_vertex), polygon_sizes)
+        has_uvs = len(uvs) and (unique_corners[:, 1] >= 0).all()
+        has_normals = len(normals) and (unique_corners[:, 2] >= 0).all()
+        return Mesh(
+            positions[unique_corners[:, 0]],
+            normals[unique_corners[:, 2]] if has_normals else None,
+            uvs[unique_corners[:, 1]] if has_uvs else None,
+            faces,
+        )
+
+    @staticmethod
+    def parse_corner(corner:str, positions:int, uvs:int, normals:int):
+        """
+        Zero based (v, vt, vn) indices of a face corner, -1 when an index is missing
+        """
+        indices = corner.split("/")
+        indices += [""] * (3 - len(indices))
+        result = []
+        for index, count in zip(indices, (positions, uvs, normals)):
+            if not index:
+                result.append(-1)
+            else:
+                index = int(index)
+                # negative indices count back from the last element read
+                result.append(index + count if index < 0 else index - 1)
+        return result
+
+    @staticmethod
+    def triangulate(corner_vertex:np.ndarray, polygon_sizes:list):
+        """
+        Split every polygon into a fan of triangles around its first corner
+        """
+        polygon_sizes = np.array(polygon_sizes, dtype=np.int64)
+        polygon_starts = np.concatenate(([0], np.cumsum(polygon_sizes)[:-1]))
+        triangles_per_polygon = np.maximum(polygon_sizes - 2, 0)
+        first = np.repeat(polygon_starts, triangles_per_polygon)
+        # position of each triangle inside its polygon fan
+        fan = np.arange(triangles_per_polygon.sum()) - np.repeat(np.cumsum(triangles_per_polygon) - triangles_per_polygon, triangles_per_polygon)
+        return np.stack((corner_vertex[first], corner_vertex[first + fan + 1], corner_vertex[first + fan + 2]), axis=1)
@@ -0,0 +1,90 @@
+import numpy as np
+from .mesh import Mesh
+
+
+class OBJWriter:
+    """
+    Buffered Wavefront OBJ writer, every section of a mesh is formatted in bulk
+    from its arrays instead of line by line. Several meshes can be written into the
+    same file, their face indices are offset while they are written
+    """
+    BUFFER_SIZE = 1 << 20
+    CHUNK_ROWS = 1 << 14
+
+    def __init__(self, file_path:str, precision:int=6, export_normals:bool=True, buffer_size:int=BUFFER_SIZE):
+        self.file_path = file_path
+        self.precision = precision
+        self.export_normals = export_normals
+        self.buffer_size = buffer_size
+        self.vertex_offset = 0
+        self.uv_offset = 0
+        self.normal_offset = 0
+        self.obj_file = None
+
+    def __enter__(self):
+        self.obj_file = open(self.file_path, "w", buffering=self.buffer_size)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.obj_file.close()
+        self.obj_file = None
+
+    def write_header(self, title:str, mtllib:str=None):
+        self.obj_file.write("# PES/WE/JL Model Tool\n")
+        self.obj_file.write(f"# OBJ Model {title}\n")
+        self.obj_file.write("\n")
+        if mtllib is not None:
+            self.obj_file.write(f"mtllib {mtllib}\n")
+            self.obj_file.write("\n")
+
+    def write_mesh(self, mesh:Mesh, name:str, material:str=None):
+        """
+        Write one mesh as an object, the indices of its faces are moved after the
+        vertices of the meshes already written
+        """
+        float_format = f"%.{self.precision}f"
+        with_normals = self.export_normals and mesh.has_normals
+        self.obj_file.write(f"o {name} \n")
+        self.obj_file.write("\n")
+        self.obj_file.write(f"# Vertices {len(mesh.positions)}\n")
+        self.write_rows(f"v  {float_format} {float_format} {float_format}\n", mesh.positions)
+        self.obj_file.write("\n")
+        self.obj_file.write(f"# UVs {len(mesh.uvs)}\n")
+        self.write_rows(f"vt  {float_format} {float_format}\n", mesh.uvs)
+        if with_normals:
+            self.obj_file.write("\n")
+            self.obj_file.write(f"# Normals {len(mesh.normals)}\n")
+            self.write_rows(f"vn  {float_format} {float_format} {float_format}\n", mesh.normals)
+        self.obj_file.write("\n")
+        if material is not None:
+            self.obj_file.write(f"usemtl {material}\n")
+            self.obj_file.write("\n")
+        self.obj_file.write(f"# Faces {len(mesh.faces)}\n")
+        # obj indices are one based and each attribute has its own running offset
+        faces = mesh.faces.astype(np.int64) + 1
+        columns = [faces + self.vertex_offset, faces + self.uv_offset]
+        if with_normals:
+            columns.append(faces + self.normal_offset)
+            self.write_rows("f  %d/%d/%d %d/%d/%d %d/%d/%d\n", np.stack(columns, axis=2))
+            self.normal_offset += len(mesh.normals)
+        else:
+            self.write_rows("f  %d/%d %d/%d %d/%d\n", np.stack(columns, axis=2))
+        self.vertex_offset += len(mesh.positions)
+        self.uv_offset += len(mesh.uvs)
+
+    def write_meshes(self, meshes):
+        """
+        Write every (mesh, name, material) coming from an iterable or generator,
+        only the mesh being written needs to be in memory
+        """
+        for mesh, name, material in meshes:
+            self.write_mesh(mesh, name, material)
+            self.obj_file.write("\n")
+
+    def write_rows(self, row_format:str, array:np.ndarray):
+        """
+        Format the rows of an array in chunks, each chunk is a single string formatting
+        """
+        for start in range(0, len(array), self.CHUNK_ROWS):
+            chunk = array[start : start + self.CHUNK_ROWS]
+            self.obj_file.write((row_format * len(chunk)) % tuple(chunk.ravel().tolist()))
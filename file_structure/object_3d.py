@@ -1,4 +1,5 @@
 class Vertex:
+  __slots__ = ("x", "y", "z")
     
   def __init__(self, x, y, z):
     self.x = x
@@ -6,9 +7,10 @@ class Vertex:
     self.z = z
 
   def __iter__(self):
-    return iter([self.x, self.y, self.z])
+    return iter((self.x, self.y, self.z))
 
 class VertexNormal:
+  __slots__ = ("x", "y", "z")
 
   def __init__(self, x, y, z):
     self.x = x
@@ -16,18 +18,20 @@ class VertexNormal:
     self.z = z
 
   def __iter__(self):
-    return iter([self.x, self.y, self.z])
+    return iter((self.x, self.y, self.z))
 
 class VertexTexture:
+  __slots__ = ("u", "v")
 
   def __init__(self, u, v):
     self.u = u
     self.v = v
 
   def __iter__(self):
-    return iter([self.u, self.v])
+    return iter((self.u, self.v))
 
 class PolygonalFace:
+    __slots__ = ("i1", "i2", "i3")
 
     def __init__(self, i1, i2, i3):
         self.i1 = i1
@@ -35,4 +39,4 @@ class PolygonalFace:
         self.i3 = i3
 
     def __iter__(self):
-        return iter([self.i1, self.i2, self.i3])
+        return iter((self.i1, self.i2, self.i3))
@@ -0,0 +1,112 @@
+import queue
+import threading
+import time
+
+
+class PipelineStage:
+    """
+    One step of a pipeline, function is called with the value left by the previous stage
+    by each of its worker threads
+    """
+    __slots__ = ("name", "function", "workers", "remaining_workers", "lock")
+
+    def __init__(self, name:str, function, workers:int=1):
+        if workers < 1:
+            raise ValueError(f"Stage {name} needs at least one worker!")
+        self.name = name
+        self.function = function
+        self.workers = workers
+        self.remaining_workers = workers
+        self.lock = threading.Lock()
+
+
+class Pipeline:
+    """
+    Chain of stages running in their own threads and joined by bounded queues, so reading one
+    file, inflating another and writing a third overlap. A full queue blocks the stage feeding it,
+    at most about queue_size items per queue plus one per worker are in flight at any time.
+    Items come out in the order they finish as (item, result, error, seconds), an error in a
+    stage skips the stages after it
+    """
+    QUEUE_SIZE = 8
+    _DONE = object()
+
+    def __init__(self, queue_size:int=QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.stages = []
+
+    def add_stage(self, name:str, function, workers:int=1):
+        self.stages.append(PipelineStage(name, function, workers))
+        return self
+
+    def run(self, items):
+        """
+        Push every item through the stages, yielding each one as it leaves the last stage.
+        When the consumer stops early the remaining items are dropped and the threads are
+        joined before the generator closes
+        """
+        if not self.stages:
+            raise ValueError("The pipeline has no stages!")
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        stop = threading.Event()
+        threads = [threading.Thread(target=self.feed, args=(items, queues[0], stop), daemon=True, name="pipeline-feed")]
+        for stage_index, pipeline_stage in enumerate(self.stages):
+            pipeline_stage.remaining_workers = pipeline_stage.workers
+            for _ in range(pipeline_stage.workers):
+                threads.append(threading.Thread(
+                    target=self.work,
+                    args=(pipeline_stage, stage_index == 0, queues[stage_index], queues[stage_index + 1], stop),
+                    daemon=True,
+                    name=f"pipeline-{pipeline_stage.name}",
+                ))
+        for thread in threads:
+            thread.start()
+        output = queues[-1]
+        finished = False
+        try:
+            while True:
+                job = output.get()
+                if job is self._DONE:
+                    finished = True
+                    break
+                item, result, error, start = job
+                yield item, result, error, time.perf_counter() - start
+        finally:
+            if not finished:
+                # the stages drop what they still get, the last ones may be blocked on the output
+                stop.set()
+                while output.get() is not self._DONE:
+                    pass
+            for thread in threads:
+                thread.join()
+
+    def feed(self, items, output:queue.Queue, stop:threading.Event):
+        for item in items:
+            if stop.is_set():
+                break
+            output.put(item)
+        output.put(self._DONE)
+
+    def work(self, pipeline_stage:PipelineStage, first:bool, source:queue.Queue, output:queue.Queue, stop:threading.Event):
+        while True:
+            job = source.get()
+            if job is self._DONE:
+                with pipeline_stage.lock:
+                    pipeline_stage.remaining_workers -= 1
+                    last = pipeline_stage.remaining_workers == 0
+                # the other workers of the stage still have to see it, the last one passes it on
+                (output if last else source).put(self._DONE)
+                return
+            if stop.is_set():
+                continue
+            if first:
+                # the time of an item counts from when a worker picks it, not while it waits to enter
+                item, value, error, start = job, job, None, time.perf_counter()
+            else:
+                item, value, error, start = job
+            if error is None:
+                try:
+                    value = pipeline_stage.function(value)
+                except Exception as e:
+                    value, error = None, f"{type(e).__name__}: {e}"
+            output.put((item, value, error, start))
@@ -0,0 +1,158 @@
+import cProfile
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+
+
+class Stage:
+    """
+    Record of one run of a stage, bytes can be set inside the with block when
+    the size is only known at the end
+    """
+    __slots__ = ("profiler", "name", "bytes", "start")
+
+    def __init__(self, profiler, name:str, nbytes:int):
+        self.profiler = profiler
+        self.name = name
+        self.bytes = nbytes
+
+    def __enter__(self):
+        if self.profiler.capture == "tracemalloc":
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self.start
+        peak_bytes = tracemalloc.get_traced_memory()[1] if self.profiler.capture == "tracemalloc" else None
+        self.profiler.record(self.name, seconds, self.bytes, peak_bytes)
+
+
+class NullStage:
+    """
+    What stage returns while profiling is off, it does nothing at all
+    """
+    __slots__ = ("bytes",)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+class Profiler:
+    """
+    Collects the wall time and bytes processed by each stage of the pipeline, optionally with
+    a cProfile of the whole run or the tracemalloc peak of each stage. Callbacks get
+    (name, seconds, bytes) after every stage
+    """
+    CAPTURES = (None, "cprofile", "tracemalloc")
+    TOP_FUNCTIONS = 25
+
+    def __init__(self, capture:str=None, callbacks:list=None):
+        if capture not in self.CAPTURES:
+            raise ValueError(f"Unknown capture mode {capture}!")
+        self.capture = capture
+        self.callbacks = list(callbacks or [])
+        self.stages = {}
+        self.functions = {}
+        self.c_profile = None
+        # stages can be recorded from several threads at once
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def enable(self):
+        global _active_profiler
+        _active_profiler = self
+        if self.capture == "cprofile":
+            self.c_profile = cProfile.Profile()
+            self.c_profile.enable()
+        elif self.capture == "tracemalloc":
+            tracemalloc.start()
+
+    def disable(self):
+        global _active_profiler
+        if _active_profiler is self:
+            _active_profiler = None
+        if self.c_profile is not None:
+            self.c_profile.disable()
+            self.load_functions(pstats.Stats(self.c_profile))
+            self.c_profile = None
+        elif self.capture == "tracemalloc":
+            tracemalloc.stop()
+
+    def record(self, name:str, seconds:float, nbytes:int=0, peak_bytes:int=None):
+        with self.lock:
+            stage = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "bytes": 0})
+            stage["calls"] += 1
+            stage["seconds"] += seconds
+            stage["bytes"] += nbytes or 0
+            if peak_bytes is not None:
+                stage["peak_bytes"] = max(stage.get("peak_bytes", 0), peak_bytes)
+        for callback in self.callbacks:
+            callback(name, seconds, nbytes)
+
+    def load_functions(self, stats:pstats.Stats):
+        for (file_name, line, function_name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            function = self.functions.setdefault(
+                f"{file_name}:{line}({function_name})", {"calls": 0, "tottime": 0.0, "cumtime": 0.0}
+            )
+            function["calls"] += calls
+            function["tottime"] += tottime
+            function["cumtime"] += cumtime
+
+    def merge(self, summary:dict):
+        """
+        Add the summary of another profiler, as the ones sent back by worker processes
+        """
+        for name, other in summary["stages"].items():
+            stage = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "bytes": 0})
+            stage["calls"] += other["calls"]
+            stage["seconds"] += other["seconds"]
+            stage["bytes"] += other["bytes"]
+            if "peak_bytes" in other:
+                stage["peak_bytes"] = max(stage.get("peak_bytes", 0), other["peak_bytes"])
+        for other in summary.get("functions", []):
+            function = self.functions.setdefault(other["function"], {"calls": 0, "tottime": 0.0, "cumtime": 0.0})
+            for key in ("calls", "tottime", "cumtime"):
+                function[key] += other[key]
+
+    def summary(self):
+        """
+        Machine readable summary, stages with their totals and throughput and the
+        functions that took most of the time when cProfile was on
+        """
+        stages = {}
+        for name, stage in self.stages.items():
+            stages[name] = dict(stage, mb_per_s=stage["bytes"] / 1048576 / stage["seconds"] if stage["seconds"] else 0)
+        functions = sorted(self.functions.items(), key=lambda item: item[1]["cumtime"], reverse=True)
+        return {
+            "capture": self.capture,
+            "stages": stages,
+            "functions": [dict(function, function=name) for name, function in functions[: self.TOP_FUNCTIONS]],
+        }
+
+    def write_json(self, file_path:str):
+        with open(file_path, "w", encoding="utf-8") as json_file:
+            json.dump(self.summary(), json_file, indent=2)
+
+
+_active_profiler = None
+_null_stage = NullStage()
+
+def stage(name:str, nbytes:int=0):
+    """
+    Context manager around a stage of the pipeline, it records nothing unless a profiler is enabled
+    """
+    if _active_profiler is None:
+        return _null_stage
+    return Stage(_active_profiler, name, nbytes)
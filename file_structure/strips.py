@@ -0,0 +1,136 @@
+import numpy as np
+
+
+def strip_to_triangles(tstrip_index_list, strict=True):
+    """
+    Convert a triangle strip into an (M,3) uint32 array of triangles.
+    Every odd triangle of the strip has its first two indices swapped to keep the winding,
+    triangles that repeat an index are degenerates used to join strips and are dropped.
+    With strict=False only the first index is compared against the other two, as the PSP models do
+    """
+    strip = np.asarray(tstrip_index_list, dtype=np.int64)
+    if len(strip) < 3:
+        return np.empty((0, 3), dtype=np.uint32)
+    first, second, third = strip[:-2], strip[1:-1], strip[2:]
+    keep = strip_triangles_mask(strip, strict)
+    odd = (np.arange(len(first)) & 1).astype(bool)
+    triangles = np.stack(
+        (
+            np.where(odd, second, first),
+            np.where(odd, first, second),
+            third,
+        ),
+        axis=1,
+    )
+    return triangles[keep].astype(np.uint32)
+
+def strip_triangles_mask(tstrip_index_list, strict=True):
+    """
+    Which triangles of a strip are kept by strip_to_triangles, the degenerates are False
+    """
+    strip = np.asarray(tstrip_index_list)
+    if len(strip) < 3:
+        return np.zeros(0, dtype=bool)
+    first, second, third = strip[:-2], strip[1:-1], strip[2:]
+    keep = (first != second) & (third != first)
+    if strict:
+        keep &= second != third
+    return keep
+
+def count_strip_triangles(tstrip_index_list, strict=True):
+    """
+    Number of triangles strip_to_triangles would return, without building them
+    """
+    return int(np.count_nonzero(strip_triangles_mask(tstrip_index_list, strict)))
+
+def triangles_to_strip(faces):
+    """
+    Greedy stripification of an (M,3) array of triangles into a single strip that
+    strip_to_triangles decodes back to the same triangles with the same winding.
+    Each strip starts from the free triangle with fewest free neighbours and grows while
+    a neighbour shares the last edge, strips are joined with degenerate triangles
+    """
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])]
+    triangles = [tuple(face) for face in faces.tolist()]
+    edge_triangles = {}
+    for t, (a, b, c) in enumerate(triangles):
+        for edge in ((a, b), (b, c), (c, a)):
+            edge_triangles.setdefault(frozenset(edge), []).append(t)
+    neighbours = [
+        {n for edge in ((a, b), (b, c), (c, a)) for n in edge_triangles[frozenset(edge)] if n != t}
+        for t, (a, b, c) in enumerate(triangles)
+    ]
+    free = [True] * len(triangles)
+    free_neighbours = [len(n) for n in neighbours]
+    # triangles bucketed by their free neighbours, the buckets are cleaned lazily
+    buckets = [[] for _ in range(max(free_neighbours, default=0) + 1)]
+    for t in range(len(triangles) - 1, -1, -1):
+        buckets[free_neighbours[t]].append(t)
+    strip = []
+    for _ in range(len(triangles)):
+        start = _pop_start(buckets, free, free_neighbours)
+        if start is None:
+            break
+        # every rotation of the start triangle is tried and the longest strip kept
+        best = max(
+            (_grow_strip(start, rotation, triangles, edge_triangles, free) for rotation in _rotations(triangles[start])),
+            key=lambda grown: len(grown[1]),
+        )
+        for t in best[1]:
+            free[t] = False
+            for n in neighbours[t]:
+                free_neighbours[n] -= 1
+                if free[n]:
+                    buckets[free_neighbours[n]].append(n)
+        _join_strip(strip, best[0])
+    return np.array(strip, dtype=np.int64)
+
+def _pop_start(buckets, free, free_neighbours):
+    for count, bucket in enumerate(buckets):
+        while bucket:
+            t = bucket.pop()
+            if free[t] and free_neighbours[t] == count:
+                return t
+    return None
+
+def _rotations(triangle):
+    a, b, c = triangle
+    return ((a, b, c), (b, c, a), (c, a, b))
+
+def _same_winding(triangle, a, b, c):
+    return (a, b, c) in _rotations(triangle)
+
+def _grow_strip(start, rotation, triangles, edge_triangles, free):
+    """
+    Extend a strip from the start triangle while the next triangle keeps the winding,
+    returns the strip indices and the triangles it used
+    """
+    strip = list(rotation)
+    used = [start]
+    taken = {start}
+    while True:
+        a, b = strip[-2], strip[-1]
+        odd = len(strip) % 2 == 1
+        for t in edge_triangles[frozenset((a, b))]:
+            if not free[t] or t in taken:
+                continue
+            c = next(v for v in triangles[t] if v != a and v != b)
+            # odd triangles of a strip are decoded with their first two indices swapped
+            if _same_winding(triangles[t], *((b, a, c) if odd else (a, b, c))):
+                break
+        else:
+            return strip, used
+        strip.append(c)
+        used.append(t)
+        taken.add(t)
+
+def _join_strip(strip, new_strip):
+    """
+    Append new_strip to strip through degenerate triangles, keeping its first triangle on an even position
+    """
+    if strip:
+        strip += [strip[-1], new_strip[0]]
+        if len(strip) % 2:
+            strip.append(new_strip[0])
+    strip += new_strip
@@ -1,4 +1,4 @@
-import struct, zlib, decimal
+import struct, zlib, mmap, hashlib, os
 
 def to_int(b:bytes):
     "convert little endian bytes into unsigned int "
@@ -10,6 +10,7 @@ def to_float(b:bytes):
 
 def to_decimal(b:bytes):
     "convert little endian bytes into float with six digits "
+    import decimal
     return decimal.Decimal('{0:.6f}'.format(struct.unpack('<f', b)[0])) #little endian
 
 def unzlib_it(data):
@@ -25,3 +26,80 @@ def file_read(file):
     with open(file, 'rb') as f:
         file_contents  = bytearray(f.read())
     return file_contents
+
+def file_unzlib(file, offset=0):
+    '''
+    Inflate a file from offset through mmap, the compressed bytes are never copied
+    '''
+    with open(file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as file_map:
+        with memoryview(file_map)[offset:] as payload:
+            return unzlib_it(payload)
+
+def file_digest(file, offset=0, chunk_size=1 << 20):
+    '''
+    sha256 of a file from offset read in chunks, returned unfinished so more data can be added
+    '''
+    digest = hashlib.sha256()
+    with open(file, 'rb') as f:
+        f.seek(offset)
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest
+
+
+class InflateStream:
+    '''
+    Inflate a file, or the bytes of one, from offset only as far as it is read, the compressed bytes
+    are read in chunks so looking at the first bytes of a payload does not cost inflating all of it
+    '''
+    def __init__(self, file, offset=0, chunk_size=1 << 12):
+        self.file = None
+        self.buffer = None
+        if isinstance(file, (str, os.PathLike)):
+            self.file = open(file, 'rb')
+            self.file.seek(offset)
+        else:
+            # chunks of a buffer are views, nothing is copied before it is inflated
+            self.buffer = memoryview(file)[offset:]
+        self.position = 0
+        self.chunk_size = chunk_size
+        self.decompressor = zlib.decompressobj()
+        self.data = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        if self.buffer is not None:
+            self.buffer.release()
+
+    def read_chunk(self):
+        if self.file is not None:
+            return self.file.read(self.chunk_size)
+        chunk = self.buffer[self.position : self.position + self.chunk_size]
+        self.position += len(chunk)
+        return chunk
+
+    def inflate_to(self, size):
+        '''
+        Inflate until size bytes are available or the stream ends, returns how many there are
+        '''
+        while len(self.data) < size and not self.decompressor.eof:
+            compressed = self.decompressor.unconsumed_tail or self.read_chunk()
+            if not compressed:
+                break
+            self.data += self.decompressor.decompress(compressed, size - len(self.data))
+        return len(self.data)
+
+    def read(self, start, size):
+        '''
+        size inflated bytes from start, raises ValueError when the payload is shorter
+        '''
+        if self.inflate_to(start + size) < start + size:
+            raise ValueError("Compressed data ends before the bytes requested!")
+        return bytes(self.data[start : start + size])
@@ -1,112 +1,588 @@
-from file_structure import FacePCModel, FacePS2Model, Container, unzlib_it, file_read
+from file_structure import FacePCModel, FacePS2Model, Container, Mesh, file_unzlib, file_read, zlib_it, unzlib_it
 from pathlib import Path
+from functools import partial
+import argparse
+import glob
+import os
+import sys
+import time
 
 from file_structure.image import PESImage, PNGImage
-from file_structure.models import FacePSPModel
-
-def create_obj(pes_model:FacePCModel, folder:str, filename:str, export_normals:bool):
-    with open (f"{folder}/{filename}.obj","w") as obj_file:
-        obj_file.writelines("# PES/WE/JL Model Tool\n")
-        obj_file.writelines(f"# OBJ Model {filename}\n")
-        obj_file.writelines("\n")
-        obj_file.writelines(f"mtllib {filename}.mtl\n")
-        obj_file.writelines("\n")
-        obj_file.writelines(f"o {filename} \n")
-        obj_file.writelines("\n")
-        obj_file.writelines(f"# Vertices {len(pes_model.vertex_list)}\n")
-        for i in range(len(pes_model.vertex_list)):
-            obj_file.writelines(f"v  {pes_model.vertex_list[i].x} {pes_model.vertex_list[i].y} {pes_model.vertex_list[i].z}\n")
-
-        obj_file.writelines("\n")
-        obj_file.writelines(f"# UVs {len(pes_model.vertex_texture_list)}\n")
-        for x in range(len(pes_model.vertex_texture_list)):
-            obj_file.write(f"vt  {pes_model.vertex_texture_list[x].u} {pes_model.vertex_texture_list[x].v}\n")
-
-        if export_normals:
-            obj_file.writelines("\n")
-            obj_file.writelines(f"# Normals {len(pes_model.vertex_normal_list)}\n")
-            for i in range(len(pes_model.vertex_normal_list)):
-                obj_file.writelines(f"vn  {pes_model.vertex_normal_list[i].x} {pes_model.vertex_normal_list[i].y} {pes_model.vertex_normal_list[i].z}\n")
-
-        obj_file.writelines("\n")
-        obj_file.writelines("usemtl material1\n")
-        obj_file.writelines("\n")
-        obj_file.writelines(f"# Faces {len(pes_model.polygonal_faces_list)}\n")
-        if export_normals:
-            for i in range(len(pes_model.polygonal_faces_list)):
-                obj_file.write(f"f  "
-                + f"{pes_model.polygonal_faces_list[i].i1}/{pes_model.polygonal_faces_list[i].i1}/{pes_model.polygonal_faces_list[i].i1} "
-                + f"{pes_model.polygonal_faces_list[i].i2}/{pes_model.polygonal_faces_list[i].i2}/{pes_model.polygonal_faces_list[i].i2} "
-                + f"{pes_model.polygonal_faces_list[i].i3}/{pes_model.polygonal_faces_list[i].i3}/{pes_model.polygonal_faces_list[i].i3}\n"
-                )
-        else:
-            for i in range(len(pes_model.polygonal_faces_list)):
-                obj_file.write(f"f  "
-                + f"{pes_model.polygonal_faces_list[i].i1}/{pes_model.polygonal_faces_list[i].i1} "
-                + f"{pes_model.polygonal_faces_list[i].i2}/{pes_model.polygonal_faces_list[i].i2} "
-                + f"{pes_model.polygonal_faces_list[i].i3}/{pes_model.polygonal_faces_list[i].i3}\n"
-                )
+from file_structure.models import FaceModel, FacePSPModel
+from file_structure.obj_writer import OBJWriter
+from file_structure.glb_writer import GLBWriter
+from file_structure.obj_reader import OBJReader
+from file_structure.glb_reader import GLBReader
+from file_structure.mesh_optimizer import optimize_mesh
+from file_structure.detection import detect_model, is_model_bin
+from file_structure.cache import ConversionCache
+from file_structure.container import texture_index
+from file_structure.profiling import Profiler, stage
+from file_structure.pipeline import Pipeline
+from file_structure.headers import bin_header
+from file_structure.archive import AFSArchive
+
+PLATFORMS = {"pc": 0, "ps2": 1, "psp": 2}
+MODEL_CLASSES = {0: FacePCModel, 1: FacePS2Model, 2: FacePSPModel}
+# below this the pieces fit both PS2 and PSP layouts too well to pick one
+MIN_DETECTION_CONFIDENCE = 0.5
+# reads mostly wait on the disk so there are more readers than cpus are needed
+PIPELINE_READERS = 4
+
+def export_mesh(pes_model:FacePCModel, optimize:bool=False):
+    """
+    Mesh of a model as it is exported, welded and reordered for the vertex cache when optimize is set
+    """
+    # models decode their geometry the first time the mesh is used
+    with stage("decode", len(pes_model.model_bytes)):
+        mesh = pes_model.mesh
+    if not optimize:
+        return mesh
+    with stage("optimize"):
+        return optimize_mesh(mesh)
+
+def create_obj(pes_model:FacePCModel, folder:str, filename:str, export_normals:bool, precision:int=6, optimize:bool=False):
+    write_obj(export_mesh(pes_model, optimize), folder, filename, export_normals, precision)
+
+def write_obj(mesh:Mesh, folder:str, filename:str, export_normals:bool, precision:int=6):
+    with stage("obj") as obj_stage, OBJWriter(f"{folder}/{filename}.obj", precision, export_normals) as obj_writer:
+        obj_writer.write_header(filename, f"{filename}.mtl")
+        obj_writer.write_mesh(mesh, filename, "material1")
+        obj_stage.bytes = obj_writer.obj_file.tell()
             
 def create_mtl(folder:str, filename:str):
+    create_mtl_materials(folder, filename, [("material1", f"{filename}.png")])
+
+def create_mtl_materials(folder:str, filename:str, materials:list):
+    """
+    Write a mtl file with every (material name, texture file) given, a material without texture has None
+    """
     with open(f'{folder}/{filename}.mtl',"w") as mtl_file:
-        mtl_file.writelines("newmtl material1 \n")
-        mtl_file.writelines(f"\tmap_Kd {filename}.png \n")
+        for material, texture in materials:
+            mtl_file.writelines(f"newmtl {material} \n")
+            if texture is not None:
+                mtl_file.writelines(f"\tmap_Kd {texture} \n")
 
 def get_container(unzlibed_file:bytearray):
     return Container(unzlibed_file)
 
-def get_face_hair_model(file_location:str, platform:int):
-    bin_file = file_read(file_location)
-    decompress_bin_file = unzlib_it(bin_file[32:])
-    file_ctn = get_container(decompress_bin_file)
-    if platform == 0:
-        model = FacePCModel(file_ctn.files[0])
-    elif platform == 1:
-        model = FacePS2Model(file_ctn.files[0])
-    else:
-        model = FacePSPModel(file_ctn.files[0])
-    return model
+def load_bin(file_location:str):
+    """
+    Read and inflate a .bin file once, the container is shared by the model and texture extraction.
+    Files that do not hold a model are rejected before the whole payload is inflated
+    """
+    with stage("peek"):
+        if not is_model_bin(file_location):
+            raise ValueError("Not a face or hair model!")
+    with stage("inflate", os.path.getsize(file_location)):
+        unzlibed_file = file_unzlib(file_location, 32)
+    with stage("container", len(unzlibed_file)):
+        return get_container(unzlibed_file)
+
+def load_bin_bytes(bin_bytes):
+    """
+    Same as load_bin for the bytes of a .bin, as an entry of an archive
+    """
+    with stage("peek"):
+        if not is_model_bin(bin_bytes):
+            raise ValueError("Not a face or hair model!")
+    with memoryview(bin_bytes)[32:] as payload, stage("inflate", len(payload)):
+        unzlibed_file = unzlib_it(payload)
+    with stage("container", len(unzlibed_file)):
+        return get_container(unzlibed_file)
 
-def is_hair(list_of_files:list):
-    if len(list_of_files) == 3:
-        return PESImage.PES_IMAGE_SIGNATURE == list_of_files[1][:4]
+def model_from_container(file_ctn:Container, platform:int=None):
+    """
+    Build the model of a container, when no platform is given it is detected from the model itself
+    """
+    model_bytes = file_ctn.get_file(0)
+    if platform is None:
+        with stage("detect", len(model_bytes)):
+            model_class, confidence = detect_model(model_bytes)
+        if confidence <= MIN_DETECTION_CONFIDENCE:
+            raise ValueError(f"Could not detect the platform of the model, please set it (confidence {confidence:.2f})")
     else:
-        return False
+        model_class = MODEL_CLASSES[platform]
+    with stage("parse", len(model_bytes)):
+        return model_class(model_bytes)
+
+def get_face_hair_model(file_location:str, platform:int=None):
+    return model_from_container(load_bin(file_location), platform)
+
+def texture_from_container(file_ctn:Container):
+    return file_ctn.get_file(texture_index(file_ctn.files))
+
+def has_texture(model:FaceModel):
+    """
+    Whether the texture of a model can be exported, psp textures are not supported yet
+    """
+    return not isinstance(model, FacePSPModel)
 
 def get_pes_texture(file_location:str):
-    bin_file = file_read(file_location)
-    decompress_bin_file = unzlib_it(bin_file[32:])
-    return get_container(decompress_bin_file).files[1] if is_hair(get_container(decompress_bin_file).files) else get_container(decompress_bin_file).files[-1]
+    return texture_from_container(load_bin(file_location))
 
-def bin_to_obj(file:str, platform:int, export_normals):
+def pes_image_from_container(file_ctn:Container):
+    """
+    Texture of a container with its palette in the order the png and rgba exports use
+    """
+    texture = texture_from_container(file_ctn)
+    with stage("texture", len(texture)):
+        pes_image = PESImage()
+        pes_image.from_bytes(texture)
+        pes_image.bgr_to_bgri()
+    return pes_image
+
+def png_from_container(file_ctn:Container, compression:int=-1):
+    pes_image = pes_image_from_container(file_ctn)
+    with stage("png", len(pes_image.pes_idat)):
+        png_image = PNGImage()
+        png_image.png_from_pes_img(pes_image, compression)
+    return png_image.png
+
+def rgba_from_container(file_ctn:Container):
+    """
+    Texture of a container as a (height, width, 4) uint8 array, for previews and atlases
+    that would only decode the png again
+    """
+    pes_image = pes_image_from_container(file_ctn)
+    with stage("rgba", len(pes_image.pes_idat)):
+        return pes_image.to_rgba()
+
+def get_png_texture(file_location:str, compression:int=-1):
+    return png_from_container(load_bin(file_location), compression)
+
+def get_rgba_texture(file_location:str):
+    return rgba_from_container(load_bin(file_location))
+
+def create_glb(pes_model:FacePCModel, png:bytes, folder:str, filename:str, optimize:bool=False):
+    write_glb(export_mesh(pes_model, optimize), png, folder, filename)
+
+def write_glb(mesh:Mesh, png:bytes, folder:str, filename:str):
+    with stage("glb") as glb_stage:
+        glb_writer = GLBWriter()
+        glb_writer.add_mesh(mesh, filename, png)
+        glb_writer.write(f"{folder}/{filename}.glb")
+        glb_stage.bytes = glb_writer.bin_length
+
+def bin_to_obj(file:str, platform:int, export_normals, overwrite_texture:bool=False, optimize:bool=False):
+    """
+    Export a model to obj and mtl next to the .bin, the texture is only written when it
+    does not exist yet unless overwrite_texture is set. Returns the paths of the files it made
+    """
     # from a string we get a Path object and then we get the values that we need
     bin_location = Path(file)
     bin_full_path = str(bin_location.resolve())
     bin_filename = bin_location.stem
     bin_folder_location = str(bin_location.parent)
+    file_ctn = load_bin(bin_full_path)
+    return container_to_obj(file_ctn, bin_folder_location, bin_filename, platform, export_normals, overwrite_texture, optimize)
+
+def container_to_obj(file_ctn:Container, folder:str, filename:str, platform:int, export_normals, overwrite_texture:bool=False, optimize:bool=False):
+    model = model_from_container(file_ctn, platform)
+    artifacts = []
     #"""
-    if not Path(f"{bin_folder_location}/{bin_filename}.png").is_file() and platform != 2:
-        pes_image = PESImage()
-        pes_image.from_bytes(get_pes_texture(bin_full_path))
-        pes_image.bgr_to_bgri()
-        png_image = PNGImage()
-        png_image.png_from_pes_img(pes_image)
-        with open(f"{bin_folder_location}/{bin_filename}.png", "wb") as png_file:
-            png_file.write(png_image.png)
+    if has_texture(model):
+        if overwrite_texture or not Path(f"{folder}/{filename}.png").is_file():
+            with open(f"{folder}/{filename}.png", "wb") as png_file:
+                png_file.write(png_from_container(file_ctn))
+        artifacts.append(f"{folder}/{filename}.png")
     #"""
-    model = get_face_hair_model(bin_full_path, platform)
 
     # actions to create a obj and mtl file
-    create_obj(model, bin_folder_location, bin_filename, export_normals)
+    create_obj(model, folder, filename, export_normals, optimize=optimize)
+    create_mtl(folder, filename)
+    artifacts += [f"{folder}/{filename}.obj", f"{folder}/{filename}.mtl"]
+    return artifacts
+
+def bin_to_glb(file:str, platform:int, optimize:bool=False):
+    """
+    Export a model with its texture embedded into a single binary gltf file, returns the path of the file
+    """
+    bin_location = Path(file)
+    bin_full_path = str(bin_location.resolve())
+    bin_filename = bin_location.stem
+    bin_folder_location = str(bin_location.parent)
+    file_ctn = load_bin(bin_full_path)
+    return container_to_glb(file_ctn, bin_folder_location, bin_filename, platform, optimize)
+
+def container_to_glb(file_ctn:Container, folder:str, filename:str, platform:int, optimize:bool=False):
+    model = model_from_container(file_ctn, platform)
+    png = png_from_container(file_ctn) if has_texture(model) else None
+    create_glb(model, png, folder, filename, optimize)
+    return [f"{folder}/{filename}.glb"]
+
+def read_mesh(mesh_file:str):
+    """
+    Read an obj or glb file, returns the mesh and the png embedded in the glb if there is one
+    """
+    if Path(mesh_file).suffix.lower() == ".glb":
+        glb_reader = GLBReader(mesh_file)
+        return glb_reader.read(), glb_reader.png
+    return OBJReader(mesh_file).read(), None
+
+def mesh_to_bin(mesh_file:str, bin_file:str, png_file:str=None, template_file:str=None, compression:int=9):
+    """
+    Build a PC .bin from an obj or glb file and a png, the texture embedded in a glb is used
+    when no png is given. The .bin header gets the sizes of the new payload, with a template .bin
+    the other bytes of its header, its container entries and its model and texture headers are
+    kept, only the geometry and the texture are replaced
+    """
+    mesh, png = read_mesh(mesh_file)
+    if png_file is not None:
+        png = file_read(png_file)
+    if template_file is not None:
+        file_ctn = load_bin(template_file)
+        files = [bytes(file) for file in file_ctn.files]
+        header_template = file_read(template_file)[:32]
+        model_template = files[0]
+        FacePCModel(model_template)
+        texture_template = files[texture_index(files)]
+    else:
+        if png is None:
+            raise ValueError("A texture is needed to build a .bin without a template!")
+        files = [None, None]
+        header_template = None
+        model_template = texture_template = None
+    files[0] = FacePCModel.from_mesh(mesh, model_template).model_bytes
+    if png is not None:
+        pes_image = PESImage()
+        pes_image.from_png(png)
+        files[texture_index(files) if template_file is not None else 1] = pes_image.to_bytes(texture_template)
+    container_bytes = Container.pack(files)
+    payload = zlib_it(container_bytes, compression)
+    with open(bin_file, "wb") as output_file:
+        output_file.write(bin_header(len(payload), len(container_bytes), header_template) + payload)
+
+def model_names(files:list):
+    """
+    Object name of each .bin in a merged export, the file name with a counter when it repeats
+    as the same face exported from several platforms
+    """
+    names = []
+    for file in files:
+        name = Path(file).stem
+        candidate, counter = name, 1
+        while candidate in names:
+            counter += 1
+            candidate = f"{name}_{counter}"
+        names.append(candidate)
+    return names
+
+def bins_to_obj(files:list, output_file:str, platform:int=None, export_normals:bool=True, optimize:bool=False):
+    """
+    Export several models as separate objects and materials of a single obj, as the face and hair
+    of a player. Each model is read, decoded and written before the next one is loaded, the face
+    indices are offset by the writer while it goes. Returns the paths of the files it made
+    """
+    output_location = Path(output_file)
+    folder = str(output_location.parent)
+    filename = output_location.stem
+    materials = []
+    artifacts = []
+
+    def meshes():
+        for file, name in zip(files, model_names(files)):
+            file_ctn = load_bin(str(Path(file).resolve()))
+            model = model_from_container(file_ctn, platform)
+            texture = None
+            if has_texture(model):
+                texture = f"{filename}_{name}.png"
+                with open(f"{folder}/{texture}", "wb") as png_file:
+                    png_file.write(png_from_container(file_ctn))
+                artifacts.append(f"{folder}/{texture}")
+            materials.append((name, texture))
+            yield export_mesh(model, optimize), name, name
+
+    with OBJWriter(f"{folder}/{filename}.obj", export_normals=export_normals) as obj_writer:
+        obj_writer.write_header(filename, f"{filename}.mtl")
+        obj_writer.write_meshes(meshes())
+    create_mtl_materials(folder, filename, materials)
+    return artifacts + [f"{folder}/{filename}.obj", f"{folder}/{filename}.mtl"]
+
+def bins_to_glb(files:list, output_file:str, platform:int=None, optimize:bool=False):
+    """
+    Export several models as separate nodes of a single binary gltf file with their textures embedded,
+    only the binary buffers of the models already added are kept until the file is written
+    """
+    glb_writer = GLBWriter()
+    for file, name in zip(files, model_names(files)):
+        file_ctn = load_bin(str(Path(file).resolve()))
+        model = model_from_container(file_ctn, platform)
+        png = png_from_container(file_ctn) if has_texture(model) else None
+        glb_writer.add_mesh(export_mesh(model, optimize), name, png)
+    glb_writer.write(output_file)
+    return [output_file]
+
+def archive_convert(archive_files:list, output_folder:str, platform:int=None, export_normals:bool=True, output_format:str="obj", optimize:bool=False):
+    """
+    Convert the face and hair entries of AFS archives into output_folder without extracting them,
+    each entry is inflated straight from the mapped archive. Errors are reported like batch_convert
+    and returned as (archive:entry name, error, elapsed) tuples
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    results = []
+    for archive_file in archive_files:
+        with AFSArchive(archive_file) as archive:
+            for entry, view in archive.models():
+                start = time.perf_counter()
+                filename = Path(entry.name).stem
+                try:
+                    with view:
+                        file_ctn = load_bin_bytes(view)
+                    if output_format == "glb":
+                        container_to_glb(file_ctn, output_folder, filename, platform, optimize)
+                    else:
+                        container_to_obj(file_ctn, output_folder, filename, platform, export_normals, True, optimize)
+                    error = None
+                    print(f"OK    {archive_file}:{entry.name}")
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    print(f"FAIL  {archive_file}:{entry.name}: {error}")
+                results.append((f"{archive_file}:{entry.name}", error, time.perf_counter() - start))
+    failed = sum(1 for _, error, _ in results if error is not None)
+    print(f"{len(results)} models, {len(results) - failed} converted, {failed} failed")
+    return results
+
+def find_bin_files(paths:list):
+    """
+    Directories are walked recursively looking for .bin files, any other path is used as a glob pattern
+    """
+    bin_files = []
+    for path in paths:
+        if Path(path).is_dir():
+            bin_files.extend(sorted(str(bin_file) for bin_file in Path(path).rglob("*.bin")))
+        else:
+            bin_files.extend(sorted(glob.glob(path, recursive=True)))
+    # keep the first appearance of each file
+    return list(dict.fromkeys(bin_files))
+
+def convert_file(file:str, platform:int, export_normals:bool, output_format:str, overwrite_texture:bool=False, profile:bool=False, capture:str=None, optimize:bool=False):
+    """
+    Convert a single file for the batch mode, errors are returned instead of raised
+    so one bad file does not stop the whole run. When profiling the summary of its stages is returned too
+    """
+    start = time.perf_counter()
+    artifacts = []
+    profiler = Profiler(capture) if profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        if output_format == "glb":
+            artifacts = bin_to_glb(file, platform, optimize)
+        else:
+            artifacts = bin_to_obj(file, platform, export_normals, overwrite_texture, optimize)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    if profiler is not None:
+        profiler.disable()
+    return file, error, time.perf_counter() - start, artifacts, profiler.summary() if profiler is not None else None
+
+def read_bin(file:str):
+    """
+    First stage of the pipeline mode, the whole file is read so the inflate workers never wait on the disk
+    """
+    with stage("read", os.path.getsize(file)):
+        return file, file_read(file)
+
+def inflate_bin(job:tuple):
+    file, file_bytes = job
+    with stage("peek"):
+        if not is_model_bin(file_bytes):
+            raise ValueError("Not a face or hair model!")
+    # zlib lets go of the GIL while it inflates so several of these run at once
+    with stage("inflate", len(file_bytes)):
+        unzlibed_file = unzlib_it(memoryview(file_bytes)[32:])
+    with stage("container", len(unzlibed_file)):
+        return file, get_container(unzlibed_file)
+
+def decode_bin(job:tuple, platform:int, output_format:str, overwrite_texture:bool=False, optimize:bool=False):
+    """
+    Decode the mesh and texture of a container so the writer stage only formats and writes them,
+    the texture is left as None when the obj export keeps the png already there
+    """
+    file, file_ctn = job
+    model = model_from_container(file_ctn, platform)
+    textured = has_texture(model)
+    png = None
+    if textured and (output_format == "glb" or overwrite_texture or not Path(file).with_suffix(".png").is_file()):
+        png = png_from_container(file_ctn)
+    return file, export_mesh(model, optimize), png, textured
+
+def write_bin_outputs(job:tuple, output_format:str, export_normals:bool):
+    """
+    Last stage of the pipeline mode, writes the files bin_to_obj or bin_to_glb would and returns their paths
+    """
+    file, mesh, png, textured = job
+    bin_location = Path(file)
+    bin_filename = bin_location.stem
+    bin_folder_location = str(bin_location.parent)
+    if output_format == "glb":
+        write_glb(mesh, png, bin_folder_location, bin_filename)
+        return [f"{bin_folder_location}/{bin_filename}.glb"]
+    artifacts = []
+    if textured:
+        if png is not None:
+            with open(f"{bin_folder_location}/{bin_filename}.png", "wb") as png_file:
+                png_file.write(png)
+        artifacts.append(f"{bin_folder_location}/{bin_filename}.png")
+    write_obj(mesh, bin_folder_location, bin_filename, export_normals)
     create_mtl(bin_folder_location, bin_filename)
+    return artifacts + [f"{bin_folder_location}/{bin_filename}.obj", f"{bin_folder_location}/{bin_filename}.mtl"]
 
-if __name__ == "__main__":
-    #bin_to_obj("./test/Beckham-models/pc/face-unnamed_2009.bin", 0, True)
-    #bin_to_obj("./test/Beckham-models/pc/hair-unnamed_5041.bin", 0, True)
-    #bin_to_obj("./test/Beckham-models/ps2/face-unnamed_2009.bin", 1, True)
-    #bin_to_obj("./test/Beckham-models/ps2/hair-unnamed_5041.bin", 1, True)
-    bin_to_obj("./test/Beckham-models/psp/face-unnamed_2142.bin", 2, False)
-    #bin_to_obj("./test/Beckham-models/psp/hair-unnamed_5174.bin", 2, False)
-    bin_to_obj("./test/ID01910.bin", 2, False)
+def pipeline_conversions(files:list, platform:int, export_normals:bool, output_format:str, workers:int=None, overwrite_texture:bool=False, optimize:bool=False):
+    """
+    Convert the files in a single process with threads, reads, inflates, decoding and writes of
+    different files overlap and the bounded queues between them keep the memory used flat.
+    Yields the same tuples as convert_file as each file is written
+    """
+    pipeline = Pipeline()
+    pipeline.add_stage("read", read_bin, PIPELINE_READERS)
+    pipeline.add_stage("inflate", inflate_bin, workers or os.cpu_count())
+    pipeline.add_stage("decode", partial(decode_bin, platform=platform, output_format=output_format, overwrite_texture=overwrite_texture, optimize=optimize))
+    pipeline.add_stage("write", partial(write_bin_outputs, output_format=output_format, export_normals=export_normals))
+    for file, artifacts, error, elapsed in pipeline.run(files):
+        yield file, error, elapsed, artifacts or [], None
 
+def process_conversions(files:list, platform:int, export_normals:bool, output_format:str, workers:int=None, overwrite_texture:bool=False, profiler:Profiler=None, optimize:bool=False):
+    """
+    Convert the files with a process pool, yielding the result of convert_file as each one finishes.
+    A single file or worker is converted in this process, starting a pool would cost more than the conversion
+    """
+    if len(files) == 1 or workers == 1:
+        for file in files:
+            yield convert_file(
+                file, platform, export_normals, output_format, overwrite_texture,
+                profiler is not None, profiler.capture if profiler is not None else None, optimize,
+            )
+        return
+    # multiprocessing takes a while to import, it is not needed by single conversions
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                convert_file, file, platform, export_normals, output_format, overwrite_texture,
+                profiler is not None, profiler.capture if profiler is not None else None, optimize,
+            )
+            for file in files
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+def batch_convert(files:list, platform:int=None, export_normals:bool=True, output_format:str="obj", workers:int=None, cache:ConversionCache=None, profiler:Profiler=None, optimize:bool=False, pipeline:bool=False):
+    """
+    Convert a list of .bin files in parallel with a process pool, or with the threaded pipeline of a
+    single process when pipeline is set, reporting each file as it finishes.
+    With a cache the files whose payload and options did not change since their last conversion are skipped,
+    with a profiler the stages timed by every worker are merged into it, in pipeline mode
+    only their wall time and bytes as the capture modes do not work across threads
+    """
+    results = []
+    total_bytes = sum(os.path.getsize(file) for file in files)
+    start = time.perf_counter()
+    keys = {}
+    if cache is not None:
+        options = {"platform": platform, "export_normals": export_normals, "format": output_format, "optimize": optimize}
+        pending = []
+        for file in files:
+            keys[file] = cache.key(file, options)
+            if cache.lookup(keys[file], file) is not None:
+                print(f"SKIP  {file} (cached)")
+                results.append((file, None, 0.0))
+            else:
+                pending.append(file)
+        files = pending
+    cached = len(results)
+    # the cache decides when a texture is stale so it is always rewritten
+    if pipeline:
+        if profiler is not None and profiler.capture is not None:
+            # cProfile only sees the calling thread and the tracemalloc peak is shared by all of them
+            raise ValueError("Only the time and bytes of the stages can be profiled in pipeline mode!")
+        # the pipeline threads record their stages straight into the profiler
+        if profiler is not None:
+            profiler.enable()
+        conversions = pipeline_conversions(files, platform, export_normals, output_format, workers, cache is not None, optimize)
+    else:
+        conversions = process_conversions(files, platform, export_normals, output_format, workers, cache is not None, profiler, optimize)
+    try:
+        for file, error, elapsed, artifacts, summary in conversions:
+            if summary is not None:
+                profiler.merge(summary)
+            if error is None:
+                print(f"OK    {file} ({elapsed:.3f}s)")
+                if cache is not None:
+                    cache.store(keys[file], artifacts)
+            else:
+                print(f"FAIL  {file}: {error}")
+            results.append((file, error, elapsed))
+    finally:
+        if pipeline and profiler is not None:
+            profiler.disable()
+    if cache is not None:
+        cache.save_index()
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for _, error, _ in results if error is not None)
+    print(
+        f"{len(results)} files, {len(results) - failed - cached} converted, {cached} cached, {failed} failed in {elapsed:.2f}s "
+        f"({len(results) / elapsed if elapsed else 0:.1f} files/s, {total_bytes / 1048576 / elapsed if elapsed else 0:.2f} MB/s)"
+    )
+    return results
 
+def main(argv:list=None):
+    parser = argparse.ArgumentParser(description="PES/WE/JL face and hair model exporter")
+    parser.add_argument("paths", nargs="+", help=".bin files, directories or glob patterns")
+    parser.add_argument("-p", "--platform", choices=[*PLATFORMS, "auto"], default="auto", help="platform of the models, detected for each file by default")
+    parser.add_argument("-f", "--format", choices=["obj", "glb"], default="obj", help="output format")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="number of worker processes, or of inflate threads with --pipeline")
+    parser.add_argument("--pipeline", action="store_true", help="overlap reads, inflates, decoding and writes with threads in a single process")
+    parser.add_argument("--no-normals", action="store_true", help="do not export the vertex normals")
+    parser.add_argument("--optimize", action="store_true", help="weld duplicated vertices and reorder the triangles for the vertex cache")
+    parser.add_argument("--cache", metavar="FOLDER", help="skip the files that did not change since they were cached in this folder")
+    parser.add_argument("--cache-size", type=int, default=1024, metavar="MB", help="maximum size of the cache")
+    parser.add_argument("-o", "--output", metavar="FILE", help="merge every model into this single obj or glb file")
+    parser.add_argument("--from-mesh", metavar="MESH", help="build the .bin given as path from this obj or glb file instead of converting")
+    parser.add_argument("--texture", metavar="PNG", help="texture of the model built with --from-mesh")
+    parser.add_argument("--template", metavar="BIN", help="original .bin whose headers are kept by --from-mesh")
+    parser.add_argument("--archive", metavar="FOLDER", help="read the paths as AFS archives and convert their face and hair files into this folder")
+    parser.add_argument("--index", metavar="DB", help="record the files into this catalogue instead of converting them")
+    parser.add_argument("--profile", metavar="JSON", help="save the time and bytes of every conversion stage into this file")
+    parser.add_argument("--profile-capture", choices=["cprofile", "tracemalloc"], help="also profile the functions or the memory peak of each stage")
+    args = parser.parse_args(argv)
+    if args.pipeline and args.profile_capture:
+        parser.error("--profile-capture can not be used with --pipeline, the stages run on several threads")
+    if args.from_mesh:
+        if len(args.paths) != 1:
+            parser.error("--from-mesh builds a single .bin")
+        mesh_to_bin(args.from_mesh, args.paths[0], args.texture, args.template)
+        return 0
+    if args.index:
+        # sqlite is only loaded to index
+        from file_structure.catalogue import Catalogue
+        with Catalogue(args.index) as catalogue:
+            updated, unchanged, removed = catalogue.scan(args.paths, args.workers)
+        print(f"{updated} files indexed, {unchanged} unchanged, {removed} removed")
+        return 0
+    if args.archive:
+        results = archive_convert(args.paths, args.archive, PLATFORMS.get(args.platform), not args.no_normals, args.format, args.optimize)
+        return 1 if any(error is not None for _, error, _ in results) else 0
+    files = find_bin_files(args.paths)
+    if not files:
+        parser.error("no .bin files found")
+    if args.output:
+        if args.format == "glb":
+            bins_to_glb(files, args.output, PLATFORMS.get(args.platform), args.optimize)
+        else:
+            bins_to_obj(files, args.output, PLATFORMS.get(args.platform), not args.no_normals, args.optimize)
+        print(f"{len(files)} models merged into {args.output}")
+        return 0
+    cache = ConversionCache(args.cache, args.cache_size * 1048576) if args.cache else None
+    profiler = Profiler(args.profile_capture) if args.profile else None
+    results = batch_convert(files, PLATFORMS.get(args.platform), not args.no_normals, args.format, args.workers, cache, profiler, args.optimize, args.pipeline)
+    if profiler is not None:
+        for name, stage_summary in profiler.summary()["stages"].items():
+            print(f"{name:10} {stage_summary['calls']:6} calls {stage_summary['seconds']:9.3f}s {stage_summary['mb_per_s']:9.2f} MB/s")
+        profiler.write_json(args.profile)
+    return 1 if any(error is not None for _, error, _ in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
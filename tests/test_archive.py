@@ -0,0 +1,79 @@
+"""
+AFS archives built by the synthetic generator, read back and converted without extraction
+"""
+import filecmp
+import struct
+import zlib
+import pytest
+import model_tool
+from benchmarks import synthetic
+from file_structure.archive import AFSArchive
+
+NAMES = ["face_0001.bin", "text.str", "other.bin", "face_0002.bin", "hair_0003.bin"]
+
+
+@pytest.fixture
+def archive_files():
+    models = [synthetic.bin_file(platform, 600, 64) for platform in synthetic.PLATFORMS]
+    # a compressed container whose first entry is not a model
+    other = bytes(32) + zlib.compress(bytes(synthetic.container([b"\x01\x02\x03\x04" * 100, b"xx"])))
+    return [models[0], b"garbage" * 10, other, models[1], models[2]]
+
+def write_archive(path, files, names=None):
+    path.write_bytes(synthetic.afs_file(files, names))
+    return str(path)
+
+def test_names_after_the_files_table(tmp_path, archive_files):
+    with AFSArchive(write_archive(tmp_path / "named.afs", archive_files, NAMES)) as archive:
+        assert [entry.name for entry in archive] == NAMES
+
+def test_names_pointer_before_the_first_file(tmp_path, archive_files):
+    archive_bytes = synthetic.afs_file(archive_files, NAMES)
+    table_end = 8 + 8 * len(archive_files)
+    pointer = archive_bytes[table_end : table_end + 8]
+    first_offset = struct.unpack_from("<I", archive_bytes, 8)[0]
+    archive_bytes[table_end : table_end + 8] = bytes(8)
+    archive_bytes[first_offset - 8 : first_offset] = pointer
+    (tmp_path / "moved.afs").write_bytes(archive_bytes)
+    with AFSArchive(str(tmp_path / "moved.afs")) as archive:
+        assert [entry.name for entry in archive] == NAMES
+
+def test_names_fall_back_to_the_archive_name(tmp_path, archive_files):
+    with AFSArchive(write_archive(tmp_path / "plain.afs", archive_files)) as archive:
+        assert [entry.name for entry in archive] == [f"plain_{i:05d}" for i in range(len(archive_files))]
+
+def test_entry_past_the_end_is_rejected(tmp_path, archive_files):
+    archive_bytes = synthetic.afs_file(archive_files)
+    struct.pack_into("<I", archive_bytes, 12, len(archive_bytes))
+    (tmp_path / "broken.afs").write_bytes(archive_bytes)
+    with pytest.raises(ValueError, match="past the end"):
+        AFSArchive(str(tmp_path / "broken.afs"))
+
+def test_not_an_archive(tmp_path):
+    (tmp_path / "x.afs").write_bytes(b"NOPE" + bytes(60))
+    with pytest.raises(ValueError, match="Not an AFS archive"):
+        AFSArchive(str(tmp_path / "x.afs"))
+
+def test_models_skip_the_other_entries(tmp_path, archive_files):
+    with AFSArchive(write_archive(tmp_path / "named.afs", archive_files, NAMES)) as archive:
+        names = []
+        for entry, view in archive.models():
+            assert bytes(view) == archive_files[entry.index]
+            view.release()
+            names.append(entry.name)
+    assert names == ["face_0001.bin", "face_0002.bin", "hair_0003.bin"]
+
+def test_archive_convert_matches_the_extracted_files(tmp_path, archive_files):
+    archive_file = write_archive(tmp_path / "named.afs", archive_files, NAMES)
+    extracted = tmp_path / "extracted"
+    extracted.mkdir()
+    for name, file in zip(NAMES, archive_files):
+        if name.startswith(("face", "hair")):
+            (extracted / name).write_bytes(file)
+            model_tool.bin_to_obj(str(extracted / name), None, True)
+    results = model_tool.archive_convert([archive_file], str(tmp_path / "out"))
+    assert [error for _, error, _ in results] == [None] * 3
+    outputs = sorted(path.name for path in (tmp_path / "out").iterdir())
+    assert outputs == sorted(path.name for path in extracted.iterdir() if path.suffix != ".bin")
+    for name in outputs:
+        assert filecmp.cmp(extracted / name, tmp_path / "out" / name, shallow=False)
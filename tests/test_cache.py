@@ -0,0 +1,114 @@
+"""
+Keys, restoring and eviction of the conversion cache, the artifacts are small files written
+by the tests so no conversion runs
+"""
+import itertools
+import json
+import pytest
+from benchmarks import synthetic
+from file_structure import cache as cache_module
+from file_structure.cache import ConversionCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # a strictly increasing clock so the least recently used entry never depends on the timer resolution
+    ticks = itertools.count(1)
+    monkeypatch.setattr(cache_module.time, "time", lambda: next(ticks))
+
+def write_bin(folder, name, bin_bytes):
+    folder.mkdir(parents=True, exist_ok=True)
+    bin_file = folder / f"{name}.bin"
+    bin_file.write_bytes(bin_bytes)
+    return bin_file
+
+def write_artifacts(bin_file, content:bytes):
+    artifacts = []
+    for suffix in (".obj", ".mtl"):
+        artifact = bin_file.with_suffix(suffix)
+        artifact.write_bytes(content + suffix.encode("ascii"))
+        artifacts.append(str(artifact))
+    return artifacts
+
+def test_same_bytes_under_two_names(tmp_path):
+    cache = ConversionCache(tmp_path / "cache")
+    bin_bytes = synthetic.bin_file("pc", 100, 64)
+    face = write_bin(tmp_path / "files", "face", bin_bytes)
+    hair = write_bin(tmp_path / "files", "hair", bin_bytes)
+    options = {"format": "obj"}
+    assert cache.key(str(face), options) != cache.key(str(hair), options)
+    cache.store(cache.key(str(face), options), write_artifacts(face, b"face"))
+    assert cache.lookup(cache.key(str(hair), options), str(hair)) is None
+    assert not hair.with_suffix(".obj").exists()
+
+def test_options_are_part_of_the_key(tmp_path):
+    cache = ConversionCache(tmp_path / "cache")
+    face = write_bin(tmp_path / "files", "face", synthetic.bin_file("pc", 100, 64))
+    assert cache.key(str(face), {"format": "obj"}) != cache.key(str(face), {"format": "glb"})
+
+def test_restore_next_to_another_folder(tmp_path):
+    cache = ConversionCache(tmp_path / "cache")
+    bin_bytes = synthetic.bin_file("pc", 100, 64)
+    first = write_bin(tmp_path / "first", "face", bin_bytes)
+    second = write_bin(tmp_path / "second", "face", bin_bytes)
+    options = {"format": "obj"}
+    key = cache.key(str(first), options)
+    assert cache.key(str(second), options) == key
+    cache.store(key, write_artifacts(first, b"face"))
+    artifacts = cache.lookup(key, str(second))
+    assert artifacts == [str(second.with_suffix(".obj")), str(second.with_suffix(".mtl"))]
+    for suffix in (".obj", ".mtl"):
+        assert second.with_suffix(suffix).read_bytes() == first.with_suffix(suffix).read_bytes()
+
+def test_lookup_restores_a_modified_artifact(tmp_path):
+    cache = ConversionCache(tmp_path / "cache")
+    face = write_bin(tmp_path / "files", "face", synthetic.bin_file("pc", 100, 64))
+    key = cache.key(str(face), {})
+    cache.store(key, write_artifacts(face, b"face"))
+    face.with_suffix(".obj").write_bytes(b"edited by hand")
+    cache.lookup(key, str(face))
+    assert face.with_suffix(".obj").read_bytes() == b"face.obj"
+
+def test_lookup_drops_an_entry_whose_artifacts_are_gone(tmp_path):
+    cache = ConversionCache(tmp_path / "cache")
+    face = write_bin(tmp_path / "files", "face", synthetic.bin_file("pc", 100, 64))
+    key = cache.key(str(face), {})
+    cache.store(key, write_artifacts(face, b"face"))
+    face.with_suffix(".obj").unlink()
+    (tmp_path / "cache" / key / "artifact.obj").unlink()
+    assert cache.lookup(key, str(face)) is None
+    assert key not in cache.index
+
+def test_eviction_of_the_least_recently_used(tmp_path, clock):
+    # every entry stores 2 artifacts of 9 bytes, two entries fit
+    cache = ConversionCache(tmp_path / "cache", max_bytes=40)
+    keys = []
+    for name in ("first", "second", "third"):
+        bin_file = write_bin(tmp_path / "files", name, synthetic.bin_file("pc", 100, 64))
+        keys.append(cache.key(str(bin_file), {}))
+        if name == "third":
+            # the first entry was used last, the second one goes
+            assert cache.lookup(keys[0], str(tmp_path / "files" / "first.bin")) is not None
+        cache.store(keys[-1], write_artifacts(bin_file, b"12345"))
+    assert set(cache.index) == {keys[0], keys[2]}
+    assert not (tmp_path / "cache" / keys[1]).exists()
+    assert cache.total_bytes <= cache.max_bytes
+
+def test_index_is_saved_and_reloaded(tmp_path):
+    cache = ConversionCache(tmp_path / "cache")
+    face = write_bin(tmp_path / "files", "face", synthetic.bin_file("pc", 100, 64))
+    key = cache.key(str(face), {})
+    cache.store(key, write_artifacts(face, b"face"))
+    cache.save_index()
+    assert set(ConversionCache(tmp_path / "cache").index) == {key}
+
+def test_index_of_an_older_version_is_discarded(tmp_path):
+    cache_folder = tmp_path / "cache"
+    cache_folder.mkdir()
+    old_entry = {"suffixes": [".obj"], "sizes": [4], "size": 4, "last_used": 0}
+    (cache_folder / ConversionCache.INDEX_NAME).write_text(
+        json.dumps({"version": ConversionCache.VERSION - 1, "entries": {"old": old_entry}}), encoding="utf-8"
+    )
+    cache = ConversionCache(cache_folder)
+    assert cache.index == {}
+    assert cache.lookup("old", str(tmp_path / "face.bin")) is None
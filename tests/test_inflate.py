@@ -0,0 +1,67 @@
+"""
+Partial inflate of the .bin payloads and the header checks built on it
+"""
+import os
+import struct
+import zlib
+import pytest
+from benchmarks import synthetic
+from file_structure.container import MAX_CONTAINER_FILES, peek_container
+from file_structure.detection import is_model_bin
+from file_structure.utils.common_functions import InflateStream
+
+DATA = bytes(range(256)) * 64 + os.urandom(4096)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_reads_match_the_whole_inflate(tmp_path, chunk_size):
+    compressed = zlib.compress(DATA)
+    (tmp_path / "data.z").write_bytes(b"head" + compressed)
+    for source, offset in ((str(tmp_path / "data.z"), 4), (compressed, 0)):
+        with InflateStream(source, offset, chunk_size) as stream:
+            assert stream.read(0, 8) == DATA[:8]
+            # only what was asked for is inflated
+            assert len(stream.data) == 8
+            assert stream.read(1000, 300) == DATA[1000:1300]
+            assert len(stream.data) == 1300
+            assert stream.read(len(DATA) - 5, 5) == DATA[-5:]
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_truncated_payload(chunk_size):
+    compressed = zlib.compress(DATA)[:200]
+    with InflateStream(compressed, 0, chunk_size) as stream:
+        with pytest.raises(ValueError):
+            stream.read(0, len(DATA))
+
+def test_reading_past_the_end():
+    with InflateStream(zlib.compress(DATA)) as stream:
+        with pytest.raises(ValueError):
+            stream.read(len(DATA) - 4, 8)
+
+def test_not_zlib():
+    with InflateStream(os.urandom(64)) as stream:
+        with pytest.raises(zlib.error):
+            stream.read(0, 8)
+
+def test_too_many_entries_is_not_a_container():
+    container = struct.pack("<2I", MAX_CONTAINER_FILES + 1, 8) + bytes(4 * (MAX_CONTAINER_FILES + 1))
+    with pytest.raises(ValueError, match="Not a container"):
+        peek_container(bytes(32) + zlib.compress(container))
+
+def test_peek_container(tmp_path):
+    bin_bytes = synthetic.bin_file("pc", 300, 64)
+    header = peek_container(bin_bytes)
+    assert header.total_files == 2
+    assert header.first_magic == b"\x20\x05\x04\x20"
+    assert header.inflated_bytes < 64
+
+def test_is_model_bin_on_paths_and_buffers(tmp_path):
+    other = bytes(32) + zlib.compress(bytes(synthetic.container([b"\x01\x02\x03\x04" * 10, b"xx"])))
+    cases = [(synthetic.bin_file(platform, 300, 64), True) for platform in synthetic.PLATFORMS]
+    cases += [(other, False), (os.urandom(100), False), (bytes(10), False)]
+    for i, (bin_bytes, expected) in enumerate(cases):
+        path = tmp_path / f"{i}.bin"
+        path.write_bytes(bin_bytes)
+        assert is_model_bin(str(path)) is expected
+        assert is_model_bin(bin_bytes) is expected
+        assert is_model_bin(memoryview(bytearray(bin_bytes))) is expected
@@ -0,0 +1,66 @@
+"""
+Round trip of the importer, a generated PC model is exported, built back into a .bin
+with mesh_to_bin and decoded again
+"""
+import struct
+import numpy as np
+import pytest
+import model_tool
+from benchmarks import synthetic
+from file_structure.headers import BIN_MAGIC
+
+
+def corners(mesh):
+    """
+    Sorted (position, uv) corners of every triangle, independent of the vertex and triangle order
+    """
+    rows = np.concatenate((mesh.positions[mesh.faces], mesh.uvs[mesh.faces]), axis=2).reshape(len(mesh.faces), -1)
+    rows = rows.astype(np.float64)
+    # sorted on rounded keys, the obj only keeps six decimals
+    keys = np.round(rows, 3)
+    return rows[np.lexsort(keys.T[::-1])]
+
+@pytest.fixture
+def source_bin(tmp_path):
+    bin_file = tmp_path / "face.bin"
+    bin_file.write_bytes(synthetic.bin_file("pc", 600, 64))
+    return bin_file
+
+@pytest.mark.parametrize("output_format", ["obj", "glb"])
+@pytest.mark.parametrize("with_template", [True, False])
+def test_mesh_to_bin_round_trip(tmp_path, source_bin, output_format, with_template):
+    original = model_tool.get_face_hair_model(str(source_bin)).mesh
+    if output_format == "glb":
+        model_tool.bin_to_glb(str(source_bin), None)
+    else:
+        model_tool.bin_to_obj(str(source_bin), None, True)
+    rebuilt = tmp_path / "rebuilt.bin"
+    model_tool.mesh_to_bin(
+        str(source_bin.with_suffix(f".{output_format}")),
+        str(rebuilt),
+        str(source_bin.with_suffix(".png")) if output_format == "obj" else None,
+        str(source_bin) if with_template else None,
+    )
+    mesh = model_tool.model_from_container(model_tool.load_bin(str(rebuilt))).mesh
+    assert mesh.face_count == original.face_count
+    np.testing.assert_allclose(corners(mesh), corners(original), atol=1e-5)
+
+def test_mesh_to_bin_header_matches_payload(tmp_path, source_bin):
+    model_tool.bin_to_obj(str(source_bin), None, True)
+    for template in (None, str(source_bin)):
+        rebuilt = tmp_path / "rebuilt.bin"
+        model_tool.mesh_to_bin(str(source_bin.with_suffix(".obj")), str(rebuilt), str(source_bin.with_suffix(".png")), template)
+        bin_bytes = rebuilt.read_bytes()
+        compressed_size, uncompressed_size = struct.unpack_from("<2I", bin_bytes, len(BIN_MAGIC))
+        assert bin_bytes[: len(BIN_MAGIC)] == BIN_MAGIC
+        assert compressed_size == len(bin_bytes) - 32
+        assert uncompressed_size == len(model_tool.unzlib_it(bin_bytes[32:]))
+
+def test_pc_pieces_total_read_from_parts_counter(tmp_path, source_bin):
+    model = model_tool.get_face_hair_model(str(source_bin))
+    assert model.pieces_total == 1
+    assert model.summary()["pieces"] == 1
+    model_tool.bin_to_obj(str(source_bin), None, True)
+    rebuilt = tmp_path / "rebuilt.bin"
+    model_tool.mesh_to_bin(str(source_bin.with_suffix(".obj")), str(rebuilt), str(source_bin.with_suffix(".png")))
+    assert model_tool.model_from_container(model_tool.load_bin(str(rebuilt))).pieces_total == 1
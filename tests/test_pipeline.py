@@ -0,0 +1,69 @@
+"""
+Threaded pipeline of the batch conversions, the stages are small functions so the tests
+only check the plumbing
+"""
+import threading
+import time
+from collections import Counter
+import pytest
+from file_structure.pipeline import Pipeline
+
+
+def pipeline_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith("pipeline-")]
+
+def double(value):
+    return value * 2
+
+def fail_on_seven(value):
+    if value == 14:
+        raise ValueError("seven")
+    # a little sleep so the workers of the stage really run side by side
+    time.sleep(0.001)
+    return value + 1
+
+def test_every_item_comes_out_once():
+    pipeline = Pipeline(queue_size=2)
+    pipeline.add_stage("double", double, workers=3)
+    pipeline.add_stage("add", fail_on_seven, workers=4)
+    pipeline.add_stage("negate", lambda value: -value, workers=2)
+    results = list(pipeline.run(range(50)))
+    assert Counter(item for item, _, _, _ in results) == Counter(range(50))
+    for item, result, error, seconds in results:
+        assert seconds >= 0
+        if item == 7:
+            assert result is None
+            assert error == "ValueError: seven"
+        else:
+            assert error is None
+            assert result == -(item * 2 + 1)
+    assert not pipeline_threads()
+
+def test_error_skips_the_later_stages():
+    calls = []
+    pipeline = Pipeline()
+    pipeline.add_stage("fail", fail_on_seven)
+    pipeline.add_stage("record", lambda value: calls.append(value) or value)
+    [(item, result, error, _)] = pipeline.run([14])
+    assert (item, result, error) == (14, None, "ValueError: seven")
+    assert calls == []
+
+def test_consumer_stopping_early():
+    fed = []
+    def items():
+        for item in range(1000):
+            fed.append(item)
+            yield item
+    pipeline = Pipeline(queue_size=2)
+    pipeline.add_stage("double", double, workers=2)
+    pipeline.add_stage("slow", lambda value: time.sleep(0.001) or value, workers=2)
+    results = pipeline.run(items())
+    for _ in range(3):
+        next(results)
+    results.close()
+    assert not pipeline_threads()
+    assert len(fed) < 1000
+
+def test_pipeline_needs_stages():
+    with pytest.raises(ValueError):
+        list(Pipeline().run([1]))
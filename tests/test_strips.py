@@ -0,0 +1,46 @@
+"""
+Golden outputs of the strip decoder, the expected triangles are written by hand from the
+loops the models used before the shared decoder
+"""
+import numpy as np
+from file_structure.strips import strip_to_triangles, triangles_to_strip
+
+
+def triangles(strip, strict=True):
+    return strip_to_triangles(strip, strict).tolist()
+
+def test_short_strips_have_no_triangles():
+    assert triangles([]) == []
+    assert triangles([0, 1]) == []
+
+def test_odd_triangles_swap_their_first_two_indices():
+    assert triangles([0, 1, 2, 3, 4]) == [[0, 1, 2], [2, 1, 3], [2, 3, 4]]
+
+def test_strict_drops_every_triangle_with_a_repeated_index():
+    # (1, 2, 2) and (2, 2, 3) join two strips, (3, 4, 3) repeats its first index
+    assert triangles([0, 1, 2, 2, 3, 4, 3]) == [[0, 1, 2], [3, 2, 4]]
+
+def test_non_strict_keeps_triangles_whose_last_two_indices_match():
+    # the PSP models only compare the first index with the other two
+    assert triangles([0, 1, 2, 2, 3, 4, 3], strict=False) == [[0, 1, 2], [2, 1, 2], [3, 2, 4]]
+
+def test_winding_follows_the_position_in_the_strip_after_degenerates():
+    # the degenerates still count, (5, 6, 7) is the sixth triangle so it is swapped
+    assert triangles([0, 1, 2, 2, 5, 5, 6, 7]) == [[0, 1, 2], [6, 5, 7]]
+    assert triangles([0, 1, 2, 2, 5, 6, 7]) == [[0, 1, 2], [5, 2, 6], [5, 6, 7]]
+
+def test_platform_semantics_match_the_original_loops():
+    rng = np.random.default_rng(0)
+    strip = rng.integers(0, 6, 400).tolist()
+    for strict in (True, False):
+        expected = []
+        for k in range(len(strip) - 2):
+            a, b, c = strip[k : k + 3]
+            if a != b and c != a and (b != c or not strict):
+                expected.append([b, a, c] if k & 1 else [a, b, c])
+        assert triangles(strip, strict) == expected
+
+def test_stripified_triangles_decode_back():
+    faces = np.array([[0, 1, 2], [2, 1, 3], [2, 3, 4], [5, 6, 7]], dtype=np.uint32)
+    decoded = strip_to_triangles(triangles_to_strip(faces))
+    assert sorted(map(tuple, decoded.tolist())) == sorted(map(tuple, faces.tolist()))